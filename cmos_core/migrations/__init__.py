@@ -8,29 +8,82 @@ without changing the database initialization code.
 from __future__ import annotations
 
 import sqlite3
-from typing import Callable, Iterator, List, Tuple
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from .. import schema
 
 MigrationCallback = Callable[[sqlite3.Connection], None]
 
+# Table recording which migrations have already been applied to a database.
+MIGRATIONS_TABLE = "schema_migrations"
+
 
 class MigrationManager:
     """In-memory registry that can apply migrations in insertion order."""
 
     def __init__(self) -> None:
-        self._migrations: List[Tuple[str, MigrationCallback]] = []
+        self._migrations: Dict[str, MigrationCallback] = {}
 
     def register(self, name: str, func: MigrationCallback) -> None:
-        if any(existing == name for existing, _ in self._migrations):
+        if name in self._migrations:
             raise ValueError(f"Migration '{name}' already registered")
-        self._migrations.append((name, func))
+        self._migrations[name] = func
 
     def names(self) -> Iterator[str]:
-        for name, _ in self._migrations:
-            yield name
+        return iter(self._migrations)
+
+    def applied(self, conn: sqlite3.Connection) -> Set[str]:
+        """Return the names of migrations already recorded in *conn*."""
+        try:
+            return {row[0] for row in conn.execute(f"SELECT name FROM {MIGRATIONS_TABLE}")}
+        except sqlite3.OperationalError:
+            # No migration has been recorded yet, so the table does not exist.
+            return set()
+
+    def apply(self, conn: sqlite3.Connection, name: str) -> None:
+        """Apply the single migration registered as *name*, even if already recorded."""
+        func = self._migrations.get(name)
+        if func is None:
+            raise ValueError(f"Migration '{name}' is not registered")
+        self._run(conn, [(name, func)])
 
     def apply_all(self, conn: sqlite3.Connection) -> None:
-        for _, func in self._migrations:
-            func(conn)
+        """
+        Apply every pending migration inside one transaction.
+
+        Each migration runs under its own savepoint so a failure rolls back only
+        the offending migration; those applied before it are still committed.
+        """
+        applied = self.applied(conn)
+        pending = [(name, func) for name, func in self._migrations.items() if name not in applied]
+        if pending:
+            self._run(conn, pending)
+
+    def _run(self, conn: sqlite3.Connection, migrations: List[Tuple[str, MigrationCallback]]) -> None:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        try:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                  name TEXT PRIMARY KEY,
+                  applied_at TEXT DEFAULT (datetime('now'))
+                )
+                """
+            )
+            for name, func in migrations:
+                savepoint = f'"migration_{name}"'
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    func(conn)
+                    conn.execute(f"INSERT OR REPLACE INTO {MIGRATIONS_TABLE} (name) VALUES (?)", (name,))
+                except Exception:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    raise
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            conn.commit()
 
 
 migration_manager = MigrationManager()
@@ -47,23 +100,105 @@ def _baseline(conn: sqlite3.Connection) -> None:
 migration_manager.register("baseline", _baseline)
 
 
-def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
-    return any(row[1] == column for row in rows)
+def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
 
 
 def _ensure_kb_metadata(conn: sqlite3.Connection) -> None:
-    if _column_exists(conn, "kb_sources", "title") is False:
+    source_columns = _table_columns(conn, "kb_sources")
+    chunk_columns = _table_columns(conn, "kb_chunks")
+    if "title" not in source_columns:
         conn.execute("ALTER TABLE kb_sources ADD COLUMN title TEXT")
-    if _column_exists(conn, "kb_sources", "fingerprint") is False:
+    if "fingerprint" not in source_columns:
         conn.execute("ALTER TABLE kb_sources ADD COLUMN fingerprint TEXT")
-    if _column_exists(conn, "kb_chunks", "order_index") is False:
+    if "order_index" not in chunk_columns:
         conn.execute("ALTER TABLE kb_chunks ADD COLUMN order_index INTEGER")
-    if _column_exists(conn, "kb_chunks", "section") is False:
+    if "section" not in chunk_columns:
         conn.execute("ALTER TABLE kb_chunks ADD COLUMN section TEXT")
-    if _column_exists(conn, "kb_chunks", "line") is False:
+    if "line" not in chunk_columns:
         conn.execute("ALTER TABLE kb_chunks ADD COLUMN line INTEGER")
-    conn.commit()
 
 
 migration_manager.register("kb_metadata_columns", _ensure_kb_metadata)
+
+
+def _ensure_kb_fts(conn: sqlite3.Connection) -> None:
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'kb_chunks_fts'").fetchone()
+    rebuild = row is None or "tokenize" not in (row[0] or "")
+    if rebuild:
+        # FTS5 options cannot be altered in place; recreate the index from kb_chunks.
+        conn.execute("DROP TABLE IF EXISTS kb_chunks_fts")
+    for statement in schema.KB_FTS_STATEMENTS:
+        conn.execute(statement)
+    if rebuild:
+        conn.execute("INSERT INTO kb_chunks_fts(kb_chunks_fts) VALUES ('rebuild')")
+
+
+migration_manager.register("kb_fts_index", _ensure_kb_fts)
+
+
+def _ensure_sessions_ts_index(conn: sqlite3.Connection) -> None:
+    # Index entries are ordered by (ts, rowid), which serves ORDER BY ts, id directly.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_ts ON sessions(ts)")
+
+
+migration_manager.register("sessions_ts_index", _ensure_sessions_ts_index)
+
+
+def _ensure_missions_status_index(conn: sqlite3.Connection) -> None:
+    # Serves "WHERE status = ? ORDER BY created_at, id LIMIT 1" as a single index seek.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_missions_status_created ON missions(status, created_at, id)")
+
+
+migration_manager.register("missions_status_created_index", _ensure_missions_status_index)
+
+
+def _ensure_kb_source_stat(conn: sqlite3.Connection) -> None:
+    # File mtime and size let the indexer skip unchanged sources without reading them.
+    source_columns = _table_columns(conn, "kb_sources")
+    if "mtime_ns" not in source_columns:
+        conn.execute("ALTER TABLE kb_sources ADD COLUMN mtime_ns INTEGER")
+    if "size" not in source_columns:
+        conn.execute("ALTER TABLE kb_sources ADD COLUMN size INTEGER")
+
+
+migration_manager.register("kb_source_stat_columns", _ensure_kb_source_stat)
+
+
+def _ensure_sessions_mission_index(conn: sqlite3.Connection) -> None:
+    # Serves "WHERE mission_id = ? ORDER BY ts DESC, id DESC" as a backward range scan.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_mission_ts ON sessions(mission_id, ts)")
+
+
+migration_manager.register("sessions_mission_ts_index", _ensure_sessions_mission_index)
+
+
+def _ensure_kb_chunk_fingerprints(conn: sqlite3.Connection) -> None:
+    # Paragraph digests let re-indexing keep unchanged chunks in place.
+    if "fingerprint" not in _table_columns(conn, "kb_chunks"):
+        conn.execute("ALTER TABLE kb_chunks ADD COLUMN fingerprint BLOB")
+    trigger = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'kb_chunks_au'").fetchone()
+    if trigger is not None and "UPDATE OF text" not in (trigger[0] or ""):
+        # Earlier versions re-tokenized on any update, including order/line moves.
+        conn.execute("DROP TRIGGER kb_chunks_au")
+        conn.execute(schema.KB_FTS_TRIGGERS[2])
+
+
+migration_manager.register("kb_chunk_fingerprints", _ensure_kb_chunk_fingerprints)
+
+
+def _ensure_sessions_ts_sort(conn: sqlite3.Connection) -> None:
+    # ts keeps whatever text was logged or imported, so sessions are ordered on
+    # datetime(ts) stored alongside it, which the indexes can serve.
+    if "ts_sort" not in _table_columns(conn, "sessions"):
+        conn.execute("ALTER TABLE sessions ADD COLUMN ts_sort TEXT")
+    conn.execute("UPDATE sessions SET ts_sort = datetime(ts) WHERE ts_sort IS NOT datetime(ts)")
+    conn.execute("DROP INDEX IF EXISTS idx_sessions_ts")
+    conn.execute("DROP INDEX IF EXISTS idx_sessions_mission_ts")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_ts_sort ON sessions(ts_sort)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_mission_ts_sort ON sessions(mission_id, ts_sort)")
+    # Synced session files recorded their tail by raw ts; rewrite them once.
+    conn.execute("DELETE FROM project_state WHERE key GLOB 'sessions_sync:*'")
+
+
+migration_manager.register("sessions_ts_sort_column", _ensure_sessions_ts_sort)
@@ -7,8 +7,25 @@ The SQL statements mirror the authoritative definitions in
 
 from __future__ import annotations
 
+import os
 import sqlite3
-from typing import Iterable, Sequence
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Mapping, Sequence
+
+# Knowledge base index and FTS table, named so KB_FTS_STATEMENTS can reuse them.
+KB_CHUNKS_SOURCE_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_kb_chunks_source ON kb_chunks(source_id);
+    """
+KB_CHUNKS_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS kb_chunks_fts
+    USING fts5(
+      text,
+      content='kb_chunks',
+      content_rowid='id',
+      tokenize='unicode61 remove_diacritics 2',
+      prefix='2 3 4'
+    );
+    """
 
 # Ordered collection of SQL statements that must run during initialization.
 SCHEMA_STATEMENTS: Sequence[str] = (
@@ -24,6 +41,9 @@ SCHEMA_STATEMENTS: Sequence[str] = (
     );
     """,
     """
+    CREATE INDEX IF NOT EXISTS idx_missions_status_created ON missions(status, created_at, id);
+    """,
+    """
     CREATE TABLE IF NOT EXISTS sessions (
       id INTEGER PRIMARY KEY AUTOINCREMENT,
       ts TEXT DEFAULT (datetime('now')),
@@ -31,7 +51,8 @@ SCHEMA_STATEMENTS: Sequence[str] = (
       action TEXT,
       agent TEXT,
       summary TEXT,
-      details TEXT
+      details TEXT,
+      ts_sort TEXT
     );
     """,
     """
@@ -64,6 +85,8 @@ SCHEMA_STATEMENTS: Sequence[str] = (
       path TEXT UNIQUE,
       title TEXT,
       fingerprint TEXT,
+      mtime_ns INTEGER,
+      size INTEGER,
       last_indexed_ts TEXT
     );
     """,
@@ -74,27 +97,160 @@ SCHEMA_STATEMENTS: Sequence[str] = (
       order_index INTEGER,
       section TEXT,
       line INTEGER,
-      text TEXT
+      text TEXT,
+      fingerprint BLOB
     );
     """,
+    KB_CHUNKS_SOURCE_INDEX,
+    KB_CHUNKS_FTS_TABLE,
+)
+
+# Triggers that keep kb_chunks_fts in step with incremental kb_chunks writes.
+KB_FTS_TRIGGERS: Sequence[str] = (
     """
-    CREATE VIRTUAL TABLE IF NOT EXISTS kb_chunks_fts
-    USING fts5(text, content='kb_chunks', content_rowid='id');
+    CREATE TRIGGER IF NOT EXISTS kb_chunks_ai AFTER INSERT ON kb_chunks BEGIN
+      INSERT INTO kb_chunks_fts(rowid, text) VALUES (new.id, new.text);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS kb_chunks_ad AFTER DELETE ON kb_chunks BEGIN
+      INSERT INTO kb_chunks_fts(kb_chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS kb_chunks_au AFTER UPDATE OF text ON kb_chunks BEGIN
+      INSERT INTO kb_chunks_fts(kb_chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+      INSERT INTO kb_chunks_fts(rowid, text) VALUES (new.id, new.text);
+    END;
     """,
 )
+KB_FTS_TRIGGER_NAMES: Sequence[str] = ("kb_chunks_ai", "kb_chunks_ad", "kb_chunks_au")
+
+# Statements that define the knowledge base FTS index. Kept separately so
+# migrations can upgrade databases created before these existed.
+KB_FTS_STATEMENTS: Sequence[str] = (KB_CHUNKS_SOURCE_INDEX, KB_CHUNKS_FTS_TABLE, *KB_FTS_TRIGGERS)
+
+
+def _as_script(statements: Iterable[str]) -> str:
+    body = "\n".join(statement.strip().rstrip(";") + ";" for statement in statements)
+    return f"BEGIN;\n{body}\nCOMMIT;"
+
+
+# Pre-joined scripts so the default schema is applied in a single executescript call.
+# The bulk variant omits the FTS triggers for databases that are loaded in bulk
+# and refreshed with an FTS 'rebuild' instead.
+_SCHEMA_SCRIPTS = {
+    "incremental": _as_script((*SCHEMA_STATEMENTS, *KB_FTS_TRIGGERS)),
+    "bulk": _as_script(SCHEMA_STATEMENTS),
+}
 
 PRAGMAS: Sequence[str] = (
     "PRAGMA foreign_keys = ON;",
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA cache_size = -16000;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA temp_store = MEMORY;",
 )
 
 
-def apply_pragmas(conn: sqlite3.Connection) -> None:
-    """Ensure SQLite pragmas required by the project are set."""
-    for pragma in PRAGMAS:
-        conn.execute(pragma)
+def apply_pragmas(
+    conn: sqlite3.Connection,
+    pragma_overrides: Mapping[str, str] | None = None,
+) -> None:
+    """
+    Ensure SQLite pragmas required by the project are set.
+
+    Parameters
+    ----------
+    conn:
+        An open sqlite3.Connection to configure.
+    pragma_overrides:
+        Optional mapping of pragma name to value (e.g. ``{"synchronous": "FULL"}``)
+        applied after the defaults so callers can tune per environment.
+    """
+    statements = list(PRAGMAS)
+    if pragma_overrides:
+        statements.extend(f"PRAGMA {name} = {value};" for name, value in pragma_overrides.items())
+    for pragma in statements:
+        try:
+            # journal_mode returns a row that must be consumed for the change to apply.
+            conn.execute(pragma).fetchone()
+        except sqlite3.OperationalError:
+            # Read-only or in-memory databases may reject journal/mmap changes.
+            continue
+
+
+def connect(
+    path: str | os.PathLike[str],
+    *,
+    cached_statements: int = 512,
+    pragma_overrides: Mapping[str, str] | None = None,
+) -> sqlite3.Connection:
+    """
+    Open a SQLite connection configured for CMOS workloads.
+
+    Connection-scoped pragmas (synchronous, cache size, mmap, foreign keys) do not
+    persist in the database file, so they are applied to every new connection.
+    A larger statement cache keeps the prepared statements for repeated
+    ``execute``/``executemany`` calls alive across batches.
+    """
+    conn = sqlite3.connect(path, cached_statements=cached_statements)
+    apply_pragmas(conn, pragma_overrides)
+    return conn
+
+
+def optimize(conn: sqlite3.Connection) -> None:
+    """Let SQLite refresh planner statistics for tables that need it.
+
+    ``analysis_limit`` makes any ANALYZE this triggers sample each index instead
+    of scanning it, so closing a connection after a large load stays cheap.
+    """
+    try:
+        conn.execute("PRAGMA analysis_limit = 1000;").fetchone()
+        conn.execute("PRAGMA optimize;")
+    except sqlite3.OperationalError:
+        # Optimization is best-effort; read-only databases may refuse ANALYZE.
+        pass
+
+
+def close_connection(conn: sqlite3.Connection) -> None:
+    """Run :func:`optimize` and close *conn*."""
+    try:
+        optimize(conn)
+    finally:
+        conn.close()
+
+
+@contextmanager
+def bulk_fts_load(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Suspend the kb_chunks FTS triggers and rebuild the index once on exit.
+
+    Bulk writes to kb_chunks then skip per-row tokenization. Everything runs
+    under a savepoint, so a failure restores the triggers along with the data.
+    """
+    conn.execute("SAVEPOINT kb_fts_bulk")
+    try:
+        for name in KB_FTS_TRIGGER_NAMES:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        yield conn
+        conn.execute("INSERT INTO kb_chunks_fts(kb_chunks_fts) VALUES ('rebuild')")
+        for statement in KB_FTS_TRIGGERS:
+            conn.execute(statement)
+    except BaseException:
+        conn.execute("ROLLBACK TO kb_fts_bulk")
+        conn.execute("RELEASE kb_fts_bulk")
+        raise
+    conn.execute("RELEASE kb_fts_bulk")
 
 
-def apply_schema(conn: sqlite3.Connection, statements: Iterable[str] | None = None) -> None:
+def apply_schema(
+    conn: sqlite3.Connection,
+    statements: Iterable[str] | None = None,
+    *,
+    mode: str = "incremental",
+) -> None:
     """
     Apply the CMOS schema to the provided SQLite connection.
 
@@ -104,8 +260,12 @@ def apply_schema(conn: sqlite3.Connection, statements: Iterable[str] | None = No
         An open sqlite3.Connection where the schema should be applied.
     statements:
         Optional override of the SQL statements to execute.
+    mode:
+        ``"incremental"`` (default) installs the FTS sync triggers; ``"bulk"``
+        omits them for callers that populate kb_chunks and then rebuild the
+        FTS index in one pass.
     """
+    if mode not in _SCHEMA_SCRIPTS:
+        raise ValueError(f"Unsupported schema mode '{mode}'. Expected one of {', '.join(_SCHEMA_SCRIPTS)}.")
     apply_pragmas(conn)
-    for statement in statements or SCHEMA_STATEMENTS:
-        conn.execute(statement)
-    conn.commit()
+    conn.executescript(_as_script(statements) if statements else _SCHEMA_SCRIPTS[mode])
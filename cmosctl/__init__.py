@@ -5,15 +5,28 @@ Mission B1.2 introduces the Typer-based CLI with mission management commands.
 Mission B2.1 adds conversational trigger helpers for automated workflows.
 """
 
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+
 from .cli import main
-from .kb import SearchHit, index_knowledge, search_knowledge, validate_queries
-from .recall import RecallResult, recall_knowledge, rebuild_index
-from .triggers import (
-    MissionContext,
-    MissionRunOutcome,
-    TriggerRegistry,
-    default_registry,
-)
+
+# Public helpers are resolved on first access (PEP 562) so CLI invocations only
+# import the submodules they actually use.
+_LAZY_ATTRS = {
+    "default_registry": ".triggers",
+    "TriggerRegistry": ".triggers",
+    "MissionContext": ".triggers",
+    "MissionRunOutcome": ".triggers",
+    "recall_knowledge": ".recall",
+    "RecallResult": ".recall",
+    "rebuild_index": ".recall",
+    "search_knowledge": ".kb",
+    "SearchHit": ".kb",
+    "index_knowledge": ".kb",
+    "validate_queries": ".kb",
+}
 
 __all__ = [
     "main",
@@ -29,3 +42,16 @@ __all__ = [
     "index_knowledge",
     "validate_queries",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,40 @@
+"""Backlog helpers shared by the CLI and the trigger registry."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+
+def derive_sprint_status(original_status: str | None, mission_statuses: Iterable[str | None]) -> str:
+    """Return a sprint's status from its missions' statuses, ignoring empty ones."""
+    # One pass with flags instead of a status set; Blocked outranks everything
+    # else that can be present alongside it, so it returns immediately.
+    has_completed = has_queued = has_in_progress = has_current = has_other = False
+    for status in mission_statuses:
+        if not status:
+            continue
+        if status == "Blocked":
+            return "Blocked"
+        if status == "In Progress":
+            has_in_progress = True
+        elif status == "Current":
+            has_current = True
+        elif status == "Completed":
+            has_completed = True
+        elif status == "Queued":
+            has_queued = True
+        else:
+            has_other = True
+    if has_in_progress:
+        return "In Progress"
+    if has_current:
+        return "Current"
+    if has_other:
+        return original_status or "In Progress"
+    if has_completed:
+        return "In Progress" if has_queued else "Completed"
+    if has_queued:
+        if original_status and original_status.lower() == "planned":
+            return original_status
+        return "Queued"
+    return original_status or "Queued"
@@ -0,0 +1,84 @@
+"""Template for the post-commit hook installed by ``cmosctl hook install``.
+
+``__DB_PATH__`` and ``__QUEUE_PATH__`` are replaced with JSON string literals of
+the database path and its pending-session queue. The hook appends its session to
+the queue directly, so a commit never pays for a ``cmosctl`` start-up.
+"""
+
+TEMPLATE = """\
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+DB_PATH = Path(__DB_PATH__)
+QUEUE_PATH = Path(__QUEUE_PATH__)
+
+
+def _head_commit() -> tuple[str, str, list[str]]:
+    # One git process reports the hash, subject and changed paths of HEAD.
+    output = subprocess.check_output(
+        ["git", "log", "-1", "--name-only", "--pretty=format:%H%x00%s%x00", "HEAD"],
+        text=True,
+        cwd=str(REPO_ROOT),
+    )
+    commit_hash, subject, names = output.split("\\0", 2)
+    return commit_hash, subject.strip(), [line for line in names.splitlines() if line]
+
+
+def _active_mission() -> str | None:
+    if not DB_PATH.exists():
+        return None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.row_factory = sqlite3.Row
+        query = \"\"\"
+            SELECT id
+            FROM missions
+            WHERE status = ?
+            ORDER BY created_at ASC, id ASC
+            LIMIT 1
+        \"\"\"
+        row = conn.execute(query, ("In Progress",)).fetchone()
+        if row is None:
+            row = conn.execute(query, ("Current",)).fetchone()
+        return row["id"] if row else None
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    try:
+        commit_hash, commit_message, files = _head_commit()
+        mission_id = _active_mission()
+
+        details = {"hash": commit_hash, "files": files}
+        if mission_id:
+            details["mission"] = mission_id
+
+        record = {
+            "ts": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+            "action": "commit",
+            "mission_id": mission_id,
+            "agent": "git-hook",
+            "summary": commit_message,
+            "details": json.dumps(details),
+        }
+        QUEUE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with QUEUE_PATH.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=False) + "\\n")
+    except (OSError, subprocess.CalledProcessError) as exc:
+        sys.stderr.write(f"[cmos hook] failed to log commit session: {exc}\\n")
+    except Exception as exc:  # pragma: no cover - defensive fallback
+        sys.stderr.write(f"[cmos hook] unexpected error: {exc}\\n")
+
+
+if __name__ == "__main__":
+    main()
+"""
@@ -0,0 +1,187 @@
+"""Shared file and JSON helpers for the CLI and the trigger registry."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import re
+import stat
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO
+
+# orjson decodes integers wider than 64 bits as floats, so inputs with a run of
+# 19 or more digits are left to json.loads (a false positive only costs speed).
+_LONG_DIGITS = re.compile(r"[0-9]{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"[0-9]{19}")
+
+
+@lru_cache(maxsize=None)
+def orjson_module() -> Any:
+    """Return the orjson module, or ``None`` when it is not installed.
+
+    orjson is an optional accelerator, imported on first use so commands that
+    never decode or pretty-print JSON do not pay for loading it.
+    """
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - orjson is not a required dependency
+        return None
+    return orjson
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Decode JSON with orjson when installed; values match the stdlib parser.
+
+    Inputs orjson rejects or decodes differently (NaN and Infinity literals,
+    out-of-range floats, integers wider than 64 bits) go to :func:`json.loads`.
+    """
+    orjson = orjson_module()
+    if orjson is None:
+        return json.loads(data)
+    long_digits = _LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS
+    if long_digits.search(data) is None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+# Characters a JSON document can start with (NaN and Infinity included, as
+# json.loads accepts them); plain-text details are returned without a decode attempt.
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI')
+
+
+def parse_details_field(details: str | None) -> Any:
+    """Return a session's details decoded from JSON, or the stripped text if it is not JSON.
+
+    Decoded values are memoized and shared; callers only serialize them and must
+    not mutate them.
+    """
+    if details is None:
+        return None
+    text = details.strip()
+    if not text:
+        return None
+    if text[0] not in _JSON_START_CHARS:
+        return text
+    return _decode_details(text)
+
+
+@lru_cache(maxsize=4096)
+def _decode_details(text: str) -> Any:
+    # Tool-generated sessions repeat the same details payloads.
+    try:
+        return json_loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def read_json_snapshot(path: Path) -> Any:
+    """Return the parsed JSON in *path*, reusing the previous parse while it is unchanged.
+
+    The result is shared between calls and must not be modified; read-modify-write
+    paths parse the file themselves.
+    """
+    stat = path.stat()
+    return _parse_json_snapshot(os.fspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _parse_json_snapshot(path: str, mtime_ns: int, size: int) -> Any:
+    # mtime_ns and size only key the cache so an edited file is parsed again.
+    with open(path, "rb") as handle:
+        return json_loads(handle.read())
+
+
+@lru_cache(maxsize=None)
+def _new_file_mode() -> int:
+    # The umask can only be read by setting it, so this is done once per process.
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def replace_file_text(path: Path, text: str) -> None:
+    """Write *text* to a sibling temporary file and rename it over *path*.
+
+    Readers see either the previous file or the complete new one, never a partial write.
+    Each call stages to its own uniquely named file, so concurrent writers cannot
+    collide, and the result keeps *path*'s permissions (the umask default for a new
+    file) rather than the private mode temporary files are created with.
+    """
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = _new_file_mode()
+    fd, staging = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.chmod(staging, mode)
+        os.replace(staging, path)
+    except BaseException:
+        try:
+            os.unlink(staging)
+        except OSError:
+            pass
+        raise
+
+
+def read_header(handle: BinaryIO) -> str:
+    """Return the leading ``#`` comment lines of a binary stream.
+
+    Reading stops at the first other line, so only the header is decoded.
+    """
+    header_lines: list[str] = []
+    for line in handle:
+        if not line.startswith(b"#"):
+            break
+        header_lines.append(line.rstrip(b"\r\n").decode("utf-8"))
+    return "\n".join(header_lines)
+
+
+def yaml_loader() -> type:
+    """Return PyYAML's safe loader, libyaml-backed when PyYAML was built with it."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def yaml_dumper() -> type:
+    """Return PyYAML's safe dumper, libyaml-backed when PyYAML was built with it."""
+    import yaml
+
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def load_yaml_documents(path: Path) -> tuple[str, list[Any]]:
+    """Return the comment header and the parsed YAML documents of *path*.
+
+    The YAML loader reads and decodes the byte stream itself, so the file is never
+    held as one Python string. Parsing restarts at offset 0 after the header is
+    read, which keeps line numbers in YAML error marks accurate; libyaml skips the
+    comments without building any objects for them.
+    """
+    import yaml
+
+    with path.open("rb") as handle:
+        header = read_header(handle)
+        handle.seek(0)
+        docs = list(yaml.load_all(handle, Loader=yaml_loader()))
+    return header, docs
+
+
+def write_yaml_documents(path: Path, header: str, docs: list[Any]) -> None:
+    """Write *header* and the YAML stream of *docs* to *path* with :func:`replace_file_text`."""
+    import yaml
+
+    # libyaml emits many small writes; collect them in memory and write the file once.
+    buffer = io.StringIO()
+    if header:
+        buffer.write(header.rstrip() + "\n")
+    yaml.dump_all(docs, buffer, Dumper=yaml_dumper(), sort_keys=False)
+    replace_file_text(path, buffer.getvalue())
@@ -2,100 +2,157 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Iterator, Tuple
+from typing import Callable, Iterable, Iterator, Tuple
 
 
-ALLOWED_SUFFIXES = {".md", ".markdown", ".txt", ".rst"}
+ALLOWED_SUFFIXES: frozenset[str] = frozenset({".md", ".markdown", ".txt", ".rst"})
+_SUFFIX_TUPLE = tuple(ALLOWED_SUFFIXES)
 DEFAULT_KB_ROOT = Path(__file__).resolve().parents[1] / "cmos"
 
+# Every line separator recognised by ``str.splitlines``.
+_LINE_BREAK_RE = re.compile(r"\r\n|[\r\v\f\x1c-\x1e\x85\u2028\u2029]")
+
+# Matches every line that ends a paragraph: code fences, headings and blank lines.
+# Each match starts at the newline preceding the line so the engine can seek on a
+# literal prefix; text between consecutive matches is a single paragraph.
+_BLOCK_RE = re.compile(r"\n[^\S\n]*(?:(?P<fence>```)[^\n]*|(?P<head>#+)(?P<htext>[^\n]*)|(?=\n|\Z))")
+
 
 @dataclass(slots=True)
-class Paragraph:
-    """Normalized representation of a document paragraph."""
+class ParagraphBatch:
+    """Columnar (structure-of-arrays) store of a document's paragraphs.
+
+    Index ``i`` across ``texts``, ``lines`` and ``sections`` describes one
+    paragraph, so consumers can bind columns directly without per-paragraph
+    objects.
+    """
+
+    texts: list[str] = field(default_factory=list)
+    lines: list[int] = field(default_factory=list)
+    sections: list[str | None] = field(default_factory=list)
 
-    text: str
-    line: int
-    section: str | None
+    def __len__(self) -> int:
+        return len(self.texts)
 
 
 def normalize_root(root: Path | None) -> Path:
     """Return the resolved knowledge base root directory."""
 
-    return (root or DEFAULT_KB_ROOT).resolve()
+    return _resolve_root(os.fspath(root or DEFAULT_KB_ROOT))
+
+
+@lru_cache(maxsize=None)
+def _resolve_root(root: str) -> Path:
+    return Path(root).resolve()
 
 
 def iter_source_files(root: Path) -> Iterator[Path]:
     """Yield research/doc files allowed for indexing."""
 
-    docs_dir = root / "docs"
-    research_dir = root / "research"
+    for directory in (root / "docs", root / "research"):
+        if directory.is_dir():
+            yield from _walk_source_files(os.fspath(directory))
+
 
-    for directory in (docs_dir, research_dir):
-        if not directory.exists():
+def _walk_source_files(top: str) -> Iterator[Path]:
+    # os.scandir reuses the file type reported by readdir, so entries are
+    # classified without a stat call and rejected by suffix before a Path is built.
+    stack = [top]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
             continue
-        for path in directory.rglob("*"):
-            if path.is_file() and path.suffix.lower() in ALLOWED_SUFFIXES:
-                yield path
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                name = entry.name.lower()
+                # A bare ".md" is a dotfile with no suffix, matching Path.suffix.
+                if name.endswith(_SUFFIX_TUPLE) and name not in ALLOWED_SUFFIXES and entry.is_file():
+                    yield Path(entry.path)
 
 
 def relative_path(path: Path, root: Path) -> str:
     """Compute a stable repository-relative path for *path*."""
 
-    candidates = [root.parent, root]
-    for candidate in candidates:
-        try:
-            return path.relative_to(candidate).as_posix()
-        except ValueError:
-            continue
-    return path.resolve().as_posix()
+    return make_relativizer(root)(path)
+
+
+@lru_cache(maxsize=32)
+def make_relativizer(root: Path) -> Callable[[Path], str]:
+    """Return a :func:`relative_path` specialized for *root*.
+
+    Paths produced by :func:`iter_source_files` are matched by string prefix,
+    falling back to ``Path.relative_to`` for anything else.
+    """
 
+    candidates = (root.parent, root)
+    prefixes = tuple(os.path.join(os.fspath(candidate), "") for candidate in candidates)
 
-def extract_paragraphs(text: str) -> Tuple[str, list[Paragraph]]:
+    def relativize(path: Path) -> str:
+        text = os.fspath(path)
+        for prefix in prefixes:
+            if text.startswith(prefix):
+                return text[len(prefix):].replace(os.sep, "/")
+        for candidate in candidates:
+            try:
+                return path.relative_to(candidate).as_posix()
+            except ValueError:
+                continue
+        return path.resolve().as_posix()
+
+    return relativize
+
+
+def extract_paragraphs(text: str) -> Tuple[str, ParagraphBatch]:
     """Split a document into logical paragraphs with headings."""
 
-    lines = text.splitlines()
+    text = _LINE_BREAK_RE.sub("\n", text)
+    # A leading newline lets the first line match like every other line.
+    text = "\n" + text
+
     title = None
     section = None
     in_code_block = False
-    buffer: list[str] = []
-    start_line = 1
-    blocks: list[Paragraph] = []
-
-    def flush() -> None:
-        nonlocal buffer, start_line, blocks, section
-        if not buffer:
-            return
-        paragraph = " ".join(line.strip() for line in buffer if line.strip())
-        paragraph = collapse_spaces(paragraph)
+    blocks = ParagraphBatch()
+    position = 0
+    line_number = 0
+
+    def flush(end: int) -> None:
+        # Every region starts with the newline ending the previous boundary line and
+        # holds only non-blank lines, so the paragraph begins on the next line.
+        paragraph = collapse_spaces(text[position:end])
         if paragraph:
-            blocks.append(Paragraph(text=paragraph, line=start_line, section=section))
-        buffer = []
-
-    for index, raw_line in enumerate(lines, start=1):
-        stripped = raw_line.strip()
-        if stripped.startswith("```"):
-            flush()
+            blocks.texts.append(paragraph)
+            blocks.lines.append(line_number + 1)
+            blocks.sections.append(section)
+
+    for match in _BLOCK_RE.finditer(text):
+        start = match.start()
+        if not in_code_block and start > position:
+            flush(start)
+        if match["fence"] is not None:
             in_code_block = not in_code_block
-            continue
-        if in_code_block:
-            continue
-        if stripped.startswith("#"):
-            flush()
-            heading_text = stripped.lstrip("#").strip()
-            if title is None and stripped.startswith("# "):
+        elif match["head"] is not None and not in_code_block:
+            raw_heading = match["htext"]
+            heading_text = raw_heading.strip()
+            if title is None and match["head"] == "#" and raw_heading.startswith(" "):
                 title = heading_text if heading_text else None
             section = heading_text or section
-            continue
-        if not stripped:
-            flush()
-            continue
-        if not buffer:
-            start_line = index
-        buffer.append(stripped)
+        end = match.end()
+        line_number += text.count("\n", position, end)
+        position = end
 
-    flush()
+    if not in_code_block:
+        flush(len(text))
 
     if title is None:
         title = ""
@@ -103,11 +160,21 @@ def extract_paragraphs(text: str) -> Tuple[str, list[Paragraph]]:
     return title, blocks
 
 
+def fingerprint(text: str) -> bytes:
+    """Return a compact 16-byte BLAKE2b digest identifying *text*."""
+
+    # BLAKE2b is used for its configurable digest size, not for speed: paragraphs
+    # are short enough that it costs the same as SHA-1 (see kb._fingerprint).
+
+    return hashlib.blake2b(text.encode("utf-8", errors="ignore"), digest_size=16).digest()
+
+
 def collapse_spaces(text: str) -> str:
     """Normalize whitespace runs inside *text*."""
 
-    parts = text.split()
-    return " ".join(parts)
+    # str.split/str.join stay in C and outperform a compiled ``\s+`` substitution
+    # at every paragraph size we index, so no regex is used here.
+    return " ".join(text.split())
 
 
 def shorten(text: str, *, limit: int = 280) -> str:
@@ -1,23 +1,67 @@
 from __future__ import annotations
 
-import getpass
 import json
 import os
-import shutil
-import sqlite3
-import subprocess
 import sys
-import textwrap
 from collections import Counter, defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
 
 import typer
-import yaml
 
 from . import db as db_commands
-from . import kb as kb_commands
+from ._backlog import derive_sprint_status
+from ._io import (
+    json_loads,
+    load_yaml_documents,
+    orjson_module,
+    parse_details_field,
+    read_json_snapshot,
+    replace_file_text,
+    write_yaml_documents,
+    yaml_loader,
+)
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Reused for every exported line; json.dump would build an encoder per call.
+_JSONL_ENCODE = json.JSONEncoder(ensure_ascii=False).encode
+_EXPORT_BUFFER_SIZE = 1 << 20
+
+
+def _orjson_prints_like_stdlib(value: Any) -> bool:
+    # orjson writes NaN and Infinity as null and drops the "+" from exponents
+    # ("1e16" for 1e+16); floats whose repr has neither are printed alike.
+    if isinstance(value, float):
+        text = repr(value)
+        return "e" not in text and "n" not in text
+    if isinstance(value, dict):
+        return all(_orjson_prints_like_stdlib(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_orjson_prints_like_stdlib(item) for item in value)
+    return True
+
+
+def _json_pretty_bytes(payload: Any) -> bytes:
+    """Return *payload* as UTF-8 JSON indented by two spaces.
+
+    orjson is used when installed and the output would match
+    ``json.dumps(..., ensure_ascii=False, indent=2)``; anything it cannot encode
+    (such as integers wider than 64 bits) or would print differently goes to the
+    stdlib.
+    """
+
+    orjson = orjson_module()
+    if orjson is not None and _orjson_prints_like_stdlib(payload):
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
 
 app = typer.Typer(help="CMOS command-line interface", add_completion=False, no_args_is_help=True)
 mission_app = typer.Typer(help="Mission management commands", add_completion=False)
@@ -52,6 +96,18 @@ STATUS_NORMALIZATION = {
     "planned": "Queued",
 }
 
+# Status spellings differ only by case, spaces and underscores, so every accepted
+# variant is folded into one squashed key resolved with a single lookup.
+_STATUS_SQUASH = str.maketrans("", "", " _")
+_STATUS_LOOKUP = {
+    **{status.translate(_STATUS_SQUASH).lower(): status for status in db_commands.MISSION_STATUSES},
+    **{key.translate(_STATUS_SQUASH).lower(): canonical for key, canonical in STATUS_NORMALIZATION.items()},
+}
+# Most backlog entries already spell their status canonically and skip the squash.
+_CANONICAL_STATUSES = frozenset(db_commands.MISSION_STATUSES)
+# Canonical statuses in the alphabetical order used by status distributions.
+_STATUS_DISPLAY_ORDER = tuple(sorted(set(_STATUS_LOOKUP.values())))
+
 SESSION_STATUS_FROM_ACTION = {
     "start": "in_progress",
     "complete": "completed",
@@ -63,39 +119,73 @@ DEFAULT_BACKLOG_PATH = Path("cmos/missions/backlog.yaml")
 DEFAULT_SESSIONS_PATH = Path("cmos/SESSIONS.jsonl")
 DEFAULT_PROJECT_CONTEXT_PATH = Path("cmos/PROJECT_CONTEXT.json")
 
+# Bump when the shape or normalization of cached backlog missions changes.
+_BACKLOG_CACHE_VERSION = 1
+
 
 @dataclass(slots=True)
 class BacklogTemplate:
     header: str
     docs: list[dict[str, Any]]
-    sprint_order: list[str]
-    sprint_map: dict[str, dict[str, Any]]
+    # The ``domainFields.sprints`` list inside docs[1], shape-checked at load time.
+    sprints: list[Any]
+    # Position in ``sprints`` of the first sprint with each sprintId, in backlog order.
+    sprint_index: dict[str, int]
 
 
 def _ensure_context(ctx: typer.Context) -> Path:
-    if ctx.obj is None or "db_path" not in ctx.obj:
-        raise typer.Exit(code=1)
-    return Path(ctx.obj["db_path"])
+    # The callback stores the Path typer already converted; no re-wrapping needed.
+    try:
+        return ctx.obj["db_path"]
+    except (TypeError, KeyError):
+        raise typer.Exit(code=1) from None
+
 
+def _connection(ctx: typer.Context, *, drain_sessions: bool = False) -> sqlite3.Connection:
+    """Return the invocation's shared database connection, opening it on first use.
 
-def _format_table(rows: Iterable[db_commands.Mission]) -> list[str]:
-    header = f"{'ID':<8} {'Sprint':<12} {'Status':<12} {'Name'}"
-    separator = "-" * len(header)
-    lines = [header, separator]
+    *drain_sessions* inserts queued sessions when the connection is opened.
+    """
+    db_path = _ensure_context(ctx)
+    conn = ctx.obj.get("conn")
+    if conn is None:
+        conn = db_commands.open_connection(db_path, drain_sessions=drain_sessions)
+        ctx.obj["conn"] = conn
+        # Closed with the root context, after the command finishes or exits.
+        ctx.find_root().call_on_close(lambda: db_commands.close_connection(conn))
+    return conn
+
+
+# Bound str.format methods parse each row template once instead of per row.
+_MISSION_ROW_FORMAT = "{:<8} {:<12} {:<12} {}".format
+_SESSION_ROW_FORMAT = "{:<6} {:<20} {:<10} {:<8} {:<12} {}".format
+_SESSION_SUMMARY_WIDTH = 60
+_SESSION_SUMMARY_CUT = _SESSION_SUMMARY_WIDTH - len("...")
+_MISSION_HEADER = _MISSION_ROW_FORMAT("ID", "Sprint", "Status", "Name")
+_MISSION_SEPARATOR = "-" * len(_MISSION_HEADER)
+_SESSION_HEADER = _SESSION_ROW_FORMAT("ID", "Timestamp", "Mission", "Action", "Agent", "Summary")
+_SESSION_SEPARATOR = "-" * len(_SESSION_HEADER)
+
+
+def _format_table(rows: Iterable[db_commands.Mission]) -> Iterator[str]:
+    yield _MISSION_HEADER
+    yield _MISSION_SEPARATOR
+    row_format = _MISSION_ROW_FORMAT
     for mission in rows:
-        sprint = mission.sprint_id or "-"
-        lines.append(f"{mission.id:<8} {sprint:<12} {mission.status:<12} {mission.name}")
-    return lines
+        yield row_format(mission.id, mission.sprint_id or "-", mission.status, mission.name)
 
 
-_SESSION_ACTIONS = set(db_commands.SESSION_ACTIONS)
+_SESSION_ACTIONS = frozenset(db_commands.SESSION_ACTIONS)
 _SESSION_ACTIONS_DISPLAY = ", ".join(db_commands.SESSION_ACTIONS)
 
 
+@lru_cache(maxsize=None)
 def _default_agent() -> str:
     env_agent = os.getenv("CMOS_AGENT")
     if env_agent and env_agent.strip():
         return env_agent.strip()
+    import getpass
+
     try:
         return getpass.getuser()
     except Exception:  # pragma: no cover - fallback for unusual environments
@@ -103,26 +193,27 @@ def _default_agent() -> str:
 
 
 def _validate_session_action(action: str) -> str:
+    if action in _SESSION_ACTIONS:
+        return action
     normalized = action.strip().lower()
     if normalized not in _SESSION_ACTIONS:
         raise typer.BadParameter(f"Action must be one of {_SESSION_ACTIONS_DISPLAY}.")
     return normalized
 
 
-def _format_sessions_table(rows: Iterable[db_commands.Session]) -> list[str]:
-    header = f"{'ID':<6} {'Timestamp':<20} {'Mission':<10} {'Action':<8} {'Agent':<12} {'Summary'}"
-    separator = "-" * len(header)
-    lines = [header, separator]
+def _format_sessions_table(rows: Iterable[db_commands.Session]) -> Iterator[str]:
+    yield _SESSION_HEADER
+    yield _SESSION_SEPARATOR
+    row_format = _SESSION_ROW_FORMAT
+    width = _SESSION_SUMMARY_WIDTH
+    cut = _SESSION_SUMMARY_CUT
     for session in rows:
-        mission = session.mission_id or "-"
-        agent = session.agent or "-"
         summary = session.summary or "-"
-        if len(summary) > 60:
-            summary = summary[:57] + "..."
-        lines.append(
-            f"{session.id:<6} {session.ts:<20} {mission:<10} {session.action:<8} {agent:<12} {summary}"
+        if len(summary) > width:
+            summary = f"{summary[:cut]}..."
+        yield row_format(
+            session.id, session.ts, session.mission_id or "-", session.action, session.agent or "-", summary
         )
-    return lines
 
 
 def _optional_str(value: str | None) -> str | None:
@@ -137,30 +228,9 @@ def _normalize_status_input(value: str) -> str:
     if not normalized:
         raise typer.BadParameter("Status cannot be empty.")
 
-    direct = STATUS_NORMALIZATION.get(normalized)
-    if direct:
-        return direct
-
-    title_candidate = normalized.title()
-    direct = STATUS_NORMALIZATION.get(title_candidate)
-    if direct:
-        return direct
-
-    simplified = normalized.replace("_", " ").strip()
-    direct = STATUS_NORMALIZATION.get(simplified)
-    if direct:
-        return direct
-
-    simplified_key = simplified.lower().replace(" ", "")
-    for key, canonical in STATUS_NORMALIZATION.items():
-        key_normalized = key.lower().replace(" ", "").replace("_", "")
-        if key_normalized == simplified_key:
-            return canonical
-
-    for status in db_commands.MISSION_STATUSES:
-        match_key = status.lower().replace(" ", "")
-        if match_key == simplified_key:
-            return status
+    canonical = _STATUS_LOOKUP.get(normalized.translate(_STATUS_SQUASH).lower())
+    if canonical:
+        return canonical
 
     expected = ", ".join(db_commands.MISSION_STATUSES)
     raise typer.BadParameter(f"Unsupported status '{value}'. Expected one of {expected}.")
@@ -175,7 +245,7 @@ def cli(
         help="Path to the CMOS SQLite database (default: .cmos/memory.db)",
     ),
 ) -> None:
-    ctx.obj = {"db_path": Path(db_path)}
+    ctx.obj = {"db_path": db_path}
     db_commands.ensure_database(db_path)
 
 
@@ -219,6 +289,9 @@ def db_shell(
         help="SQLite executable to use (default: sqlite3)",
     ),
 ) -> None:
+    import shutil
+    import subprocess
+
     db_path = _ensure_context(ctx)
     executable = sqlite_bin or "sqlite3"
     resolved = shutil.which(executable)
@@ -238,16 +311,15 @@ def db_shell(
 
 @mission_app.command("list")
 def mission_list(ctx: typer.Context) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        missions = db_commands.list_missions(conn)
+    conn = _connection(ctx)
+    missions = db_commands.list_missions(conn)
 
     if not missions:
         typer.echo("No missions found. Use 'cmosctl mission add' to create one.")
         raise typer.Exit(code=0)
 
-    for line in _format_table(missions):
-        typer.echo(line)
+    # One echo issues a single write for the whole table.
+    typer.echo("\n".join(_format_table(missions)))
 
 
 @mission_app.command("show")
@@ -255,9 +327,8 @@ def mission_show(
     ctx: typer.Context,
     mission_id: str = typer.Argument(..., help="Mission identifier to display"),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        mission = db_commands.get_mission(conn, mission_id=mission_id)
+    conn = _connection(ctx)
+    mission = db_commands.get_mission(conn, mission_id=mission_id)
 
     if mission is None:
         typer.echo(f"Mission {mission_id} not found.")
@@ -270,7 +341,7 @@ def mission_show(
     typer.echo(f"Created: {mission.created_at or '-'}")
     typer.echo(f"Completed: {mission.completed_at or '-'}")
     typer.echo("Notes:")
-    typer.echo((mission.notes or "-").strip() or "-")
+    typer.echo((mission.notes or "").strip() or "-")
 
 
 @mission_app.command("edit")
@@ -292,84 +363,89 @@ def mission_edit(
         help="Open the mission in $EDITOR for manual editing (default: editor if no flags provided)",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        mission = db_commands.get_mission(conn, mission_id=mission_id)
-        if mission is None:
-            typer.echo(f"Mission {mission_id} not found.")
-            raise typer.Exit(code=1)
+    conn = _connection(ctx)
+    mission = db_commands.get_mission(conn, mission_id=mission_id)
+    if mission is None:
+        typer.echo(f"Mission {mission_id} not found.")
+        raise typer.Exit(code=1)
+
+    updates: dict[str, Any] = {}
+    if name is not None:
+        updates["name"] = name.strip()
+    if sprint is not None:
+        updates["sprint_id"] = _optional_str(sprint)
+    if status is not None:
+        updates["status"] = _normalize_status_input(status)
+    if notes is not None:
+        updates["notes"] = _optional_str(notes)
+    if completed_at is not None:
+        updates["completed_at"] = _optional_str(completed_at)
+
+    use_editor = editor if editor is not None else (not updates)
+
+    if use_editor:
+        payload = {
+            "id": mission.id,
+            "sprint_id": mission.sprint_id,
+            "name": mission.name,
+            "status": mission.status,
+            "completed_at": mission.completed_at,
+            "notes": mission.notes,
+        }
+        # The buffer is JSON so the common path never loads PyYAML; YAML (a JSON
+        # superset) is only parsed when the edited text is no longer valid JSON.
+        initial_text = json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+        edited = typer.edit(initial_text, extension=".json")
+        if edited is None:
+            typer.echo("Edit cancelled; no changes applied.")
+            raise typer.Exit(code=0)
+        try:
+            updated_payload = json.loads(edited) or {}
+        except json.JSONDecodeError:
+            import yaml
 
-        updates: dict[str, Any] = {}
-        if name is not None:
-            updates["name"] = name.strip()
-        if sprint is not None:
-            updates["sprint_id"] = _optional_str(sprint)
-        if status is not None:
-            updates["status"] = _normalize_status_input(status)
-        if notes is not None:
-            updates["notes"] = _optional_str(notes)
-        if completed_at is not None:
-            updates["completed_at"] = _optional_str(completed_at)
-
-        use_editor = editor if editor is not None else (not updates)
-
-        if use_editor:
-            payload = {
-                "id": mission.id,
-                "sprint_id": mission.sprint_id,
-                "name": mission.name,
-                "status": mission.status,
-                "completed_at": mission.completed_at,
-                "notes": mission.notes,
-            }
-            initial_text = yaml.safe_dump(payload, sort_keys=False)
-            edited = typer.edit(initial_text, extension=".yaml")
-            if edited is None:
-                typer.echo("Edit cancelled; no changes applied.")
-                raise typer.Exit(code=0)
             try:
-                updated_payload = yaml.safe_load(edited) or {}
+                updated_payload = yaml.load(edited, Loader=yaml_loader()) or {}
             except yaml.YAMLError as exc:
                 typer.echo(f"Failed to parse edited mission: {exc}")
                 raise typer.Exit(code=1) from exc
 
-            if not isinstance(updated_payload, dict):
-                typer.echo("Edited content must be a mapping.")
-                raise typer.Exit(code=1)
-
-            for field_name in ("name", "sprint_id", "status", "completed_at", "notes"):
-                if field_name not in updated_payload:
-                    continue
-                value = updated_payload[field_name]
-                if field_name == "status" and value is not None:
-                    updates["status"] = _normalize_status_input(str(value))
-                elif field_name == "sprint_id":
-                    updates["sprint_id"] = _optional_str(str(value) if value is not None else None)
-                elif field_name == "completed_at":
-                    updates["completed_at"] = _optional_str(str(value) if value is not None else None)
-                elif field_name == "notes":
-                    updates["notes"] = _optional_str(str(value) if value is not None else None)
-                elif field_name == "name":
-                    updates["name"] = str(value).strip() if value is not None else ""
-
-        if not updates:
-            typer.echo("No changes detected.")
-            raise typer.Exit(code=0)
+        if not isinstance(updated_payload, dict):
+            typer.echo("Edited content must be a mapping.")
+            raise typer.Exit(code=1)
 
-        try:
-            updated = db_commands.update_mission(conn, mission_id=mission.id, **updates)
-        except ValueError as exc:
-            typer.echo(str(exc))
-            raise typer.Exit(code=1) from exc
+        for field_name in ("name", "sprint_id", "status", "completed_at", "notes"):
+            if field_name not in updated_payload:
+                continue
+            value = updated_payload[field_name]
+            if field_name == "status" and value is not None:
+                updates["status"] = _normalize_status_input(str(value))
+            elif field_name == "sprint_id":
+                updates["sprint_id"] = _optional_str(str(value) if value is not None else None)
+            elif field_name == "completed_at":
+                updates["completed_at"] = _optional_str(str(value) if value is not None else None)
+            elif field_name == "notes":
+                updates["notes"] = _optional_str(str(value) if value is not None else None)
+            elif field_name == "name":
+                updates["name"] = str(value).strip() if value is not None else ""
+
+    if not updates:
+        typer.echo("No changes detected.")
+        raise typer.Exit(code=0)
+
+    try:
+        updated = db_commands.update_mission(conn, mission_id=mission.id, **updates)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
 
     typer.echo(f"Mission {updated.id} updated.")
 
 
 @mission_app.command("verify")
 def mission_verify(ctx: typer.Context) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        issues = db_commands.collect_mission_issues(conn)
+    conn = _connection(ctx)
+    issues = db_commands.collect_mission_issues(conn)
 
     if not issues:
         typer.echo("All missions verified.")
@@ -388,9 +464,8 @@ def mission_verify(ctx: typer.Context) -> None:
 
 @mission_app.command("incomplete")
 def mission_incomplete(ctx: typer.Context) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        results = db_commands.find_incomplete_missions(conn)
+    conn = _connection(ctx)
+    results = db_commands.find_incomplete_missions(conn)
 
     if not results:
         typer.echo("No incomplete missions found.")
@@ -409,23 +484,19 @@ def mission_audit(
         None, help="Sprint identifier to audit (default: all sprints)"
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        missions = db_commands.list_missions(conn)
-        issues = db_commands.collect_mission_issues(conn)
+    conn = _connection(ctx)
+    missions = db_commands.list_missions(conn)
+    issues = db_commands.collect_mission_issues(conn, missions)
 
     if not missions:
         typer.echo("No missions found.")
         raise typer.Exit(code=0)
 
-    sprint_map: dict[str, list[db_commands.Mission]] = {}
-    sprint_order: list[str] = []
+    # Dicts preserve insertion order, so sprint_map's keys are the sprint order.
+    sprint_map: dict[str, list[db_commands.Mission]] = defaultdict(list)
     for mission in missions:
-        key = mission.sprint_id or "Unassigned"
-        if key not in sprint_map:
-            sprint_map[key] = []
-            sprint_order.append(key)
-        sprint_map[key].append(mission)
+        sprint_map[mission.sprint_id or "Unassigned"].append(mission)
+    sprint_order = list(sprint_map)
 
     if sprint:
         if sprint not in sprint_map:
@@ -447,21 +518,30 @@ def mission_audit(
         missions_in_sprint = sprint_map[sprint_id]
         typer.echo(f"Sprint: {sprint_id} ({len(missions_in_sprint)} missions)")
 
-        status_counts = Counter(m.status for m in missions_in_sprint)
+        # One pass gathers the status counts and the active/next candidates.
+        status_counts: Counter[str] = Counter()
+        in_progress = current = next_queued = None
+        for m in missions_in_sprint:
+            status = m.status
+            status_counts[status] += 1
+            if status == "In Progress":
+                in_progress = in_progress or m
+            elif status == "Current":
+                current = current or m
+            elif status == "Queued":
+                next_queued = next_queued or m
+
         counts_line = ", ".join(
             f"{status}: {status_counts.get(status, 0)}" for status in db_commands.MISSION_STATUSES
         )
         typer.echo(f"  Statuses: {counts_line}")
 
-        active = next((m for m in missions_in_sprint if m.status == "In Progress"), None)
-        if active is None:
-            active = next((m for m in missions_in_sprint if m.status == "Current"), None)
+        active = in_progress or current
         if active:
             typer.echo(f"  Active: {active.id} [{active.status}] - {active.name}")
         else:
             typer.echo("  Active: None")
 
-        next_queued = next((m for m in missions_in_sprint if m.status == "Queued"), None)
         if next_queued:
             typer.echo(f"  Next queued: {next_queued.id} - {next_queued.name}")
         else:
@@ -485,19 +565,18 @@ def mission_next(
         help="Mark the current mission as In Progress after displaying it.",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        mission = db_commands.get_in_progress_mission(conn) or db_commands.get_current_mission(conn)
+    conn = _connection(ctx)
+    mission = db_commands.get_in_progress_mission(conn) or db_commands.get_current_mission(conn)
 
-        if mission is None:
-            typer.echo("No mission with status Current or In Progress found.")
-            raise typer.Exit(code=1)
+    if mission is None:
+        typer.echo("No mission with status Current or In Progress found.")
+        raise typer.Exit(code=1)
 
-        typer.echo(f"{mission.id} [{mission.status}] - {mission.name}")
+    typer.echo(f"{mission.id} [{mission.status}] - {mission.name}")
 
-        if start and mission.status == "Current":
-            db_commands.mark_in_progress(conn, mission_id=mission.id)
-            typer.echo(f"Mission {mission.id} marked as In Progress.")
+    if start and mission.status == "Current":
+        db_commands.mark_in_progress(conn, mission_id=mission.id)
+        typer.echo(f"Mission {mission.id} marked as In Progress.")
 
 
 @mission_app.command("complete")
@@ -506,13 +585,12 @@ def mission_complete(
     mission_id: str = typer.Argument(..., help="Mission identifier to mark as completed"),
     notes: str | None = typer.Option(None, "--notes", "-n", help="Optional completion notes"),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        try:
-            promoted = db_commands.complete_mission(conn, mission_id=mission_id, notes=notes)
-        except ValueError as exc:
-            typer.echo(str(exc))
-            raise typer.Exit(code=1) from exc
+    conn = _connection(ctx)
+    try:
+        promoted = db_commands.complete_mission(conn, mission_id=mission_id, notes=notes)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
 
     typer.echo(f"Mission {mission_id} marked as Completed.")
     if promoted:
@@ -537,13 +615,12 @@ def mission_block(
         typer.echo("Blocking reason cannot be empty.")
         raise typer.Exit(code=1)
 
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        try:
-            db_commands.block_mission(conn, mission_id=mission_id, reason=reason)
-        except ValueError as exc:
-            typer.echo(str(exc))
-            raise typer.Exit(code=1) from exc
+    conn = _connection(ctx)
+    try:
+        db_commands.block_mission(conn, mission_id=mission_id, reason=reason)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
 
     typer.echo(f"Mission {mission_id} marked as Blocked.")
 
@@ -561,21 +638,22 @@ def mission_add(
         help="Initial mission status (default: Queued)",
     ),
 ) -> None:
+    import sqlite3
+
     normalized_status = _normalize_status_input(status)
 
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        try:
-            db_commands.add_mission(
-                conn,
-                mission_id=mission_id,
-                name=name,
-                sprint_id=sprint_id,
-                status=normalized_status,
-            )
-        except (ValueError, sqlite3.IntegrityError) as exc:
-            typer.echo(f"Failed to add mission: {exc}")
-            raise typer.Exit(code=1) from exc
+    conn = _connection(ctx)
+    try:
+        db_commands.add_mission(
+            conn,
+            mission_id=mission_id,
+            name=name,
+            sprint_id=sprint_id,
+            status=normalized_status,
+        )
+    except (ValueError, sqlite3.IntegrityError) as exc:
+        typer.echo(f"Failed to add mission: {exc}")
+        raise typer.Exit(code=1) from exc
 
     typer.echo(f"Mission {mission_id} added with status {normalized_status}.")
 
@@ -615,8 +693,13 @@ def session_log(
         "-d",
         help="Optional extended details or metadata",
     ),
+    queue: bool = typer.Option(
+        False,
+        "--queue",
+        envvar="CMOS_SESSION_QUEUE",
+        help="Append to the pending-session queue instead of writing to the database",
+    ),
 ) -> None:
-    db_path = _ensure_context(ctx)
     mission_value = mission.strip() if mission and mission.strip() else None
     agent_value = agent.strip() if agent and agent.strip() else _default_agent()
     summary_value = summary.strip()
@@ -624,23 +707,44 @@ def session_log(
         raise typer.BadParameter("Summary cannot be empty.")
     details_value = details.strip() if details and details.strip() else None
 
-    with db_commands.connect(db_path) as conn:
-        try:
-            session_id = db_commands.log_session(
-                conn,
-                action=action,
-                mission_id=mission_value,
-                agent=agent_value,
-                summary=summary_value,
-                details=details_value,
-            )
-        except ValueError as exc:
-            typer.echo(str(exc))
-            raise typer.Exit(code=1) from exc
+    if queue:
+        # Inserted by the next `session sync`, export or trigger completion.
+        db_commands.queue_session(
+            db_commands.session_queue_path(_ensure_context(ctx)),
+            action=action,
+            mission_id=mission_value,
+            agent=agent_value,
+            summary=summary_value,
+            details=details_value,
+        )
+        typer.echo(f"Queued session ({action}).")
+        return
+
+    conn = _connection(ctx)
+    try:
+        session_id = db_commands.log_session(
+            conn,
+            action=action,
+            mission_id=mission_value,
+            agent=agent_value,
+            summary=summary_value,
+            details=details_value,
+        )
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from exc
 
     typer.echo(f"Logged session {session_id} ({action}).")
 
 
+@session_app.command("sync")
+def session_sync(ctx: typer.Context) -> None:
+    db_path = _ensure_context(ctx)
+    with db_commands.connect(db_path) as conn:
+        count = db_commands.drain_session_queue(conn, db_commands.session_queue_path(db_path), recover=True)
+    typer.echo(f"Synced {count} queued sessions into {db_path}.")
+
+
 @session_app.command("list")
 def session_list(
     ctx: typer.Context,
@@ -658,21 +762,17 @@ def session_list(
         help="Maximum number of sessions to display (0 shows all)",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
     mission_value = mission.strip() if mission and mission.strip() else None
 
-    with db_commands.connect(db_path) as conn:
-        sessions = db_commands.list_sessions(conn, mission_id=mission_value)
-
-    if limit:
-        sessions = sessions[:limit]
+    conn = _connection(ctx)
+    sessions = db_commands.list_sessions(conn, mission_id=mission_value, limit=limit or None)
 
     if not sessions:
         typer.echo("No sessions found.")
         raise typer.Exit(code=0)
 
-    for line in _format_sessions_table(sessions):
-        typer.echo(line)
+    # One echo issues a single write for the whole table.
+    typer.echo("\n".join(_format_sessions_table(sessions)))
 
 
 @session_app.command("show")
@@ -680,22 +780,23 @@ def session_show(
     ctx: typer.Context,
     session_id: int = typer.Argument(..., help="Numeric identifier of the session to display"),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        session = db_commands.get_session(conn, session_id=session_id)
+    conn = _connection(ctx)
+    session = db_commands.get_session(conn, session_id=session_id)
 
     if session is None:
         typer.echo(f"Session {session_id} not found.")
         raise typer.Exit(code=1)
 
-    typer.echo(f"ID: {session.id}")
-    typer.echo(f"Timestamp: {session.ts}")
-    typer.echo(f"Mission: {session.mission_id or '-'}")
-    typer.echo(f"Action: {session.action}")
-    typer.echo(f"Agent: {session.agent or '-'}")
-    typer.echo(f"Summary: {session.summary or '-'}")
-    typer.echo("Details:")
-    typer.echo(session.details or "-")
+    typer.echo(
+        f"ID: {session.id}\n"
+        f"Timestamp: {session.ts}\n"
+        f"Mission: {session.mission_id or '-'}\n"
+        f"Action: {session.action}\n"
+        f"Agent: {session.agent or '-'}\n"
+        f"Summary: {session.summary or '-'}\n"
+        "Details:\n"
+        f"{session.details or '-'}"
+    )
 
 
 @kb_app.command("index")
@@ -704,6 +805,8 @@ def kb_index(
     root: Path | None = typer.Option(None, "--root", help="Knowledge base root (default: project cmos directory)"),
     force: bool = typer.Option(False, "--force", help="Reindex all sources even if unchanged"),
 ) -> None:
+    from . import kb as kb_commands
+
     db_path = _ensure_context(ctx)
     stats = kb_commands.index_knowledge(db_path=db_path, kb_root=root, force=force)
     typer.echo(
@@ -723,6 +826,10 @@ def kb_search(
     limit: int = typer.Option(5, "--limit", help="Maximum matches to return (0 = no limit)"),
     json_output: bool = typer.Option(False, "--json", help="Return JSON payload"),
 ) -> None:
+    import textwrap
+
+    from . import kb as kb_commands
+
     db_path = _ensure_context(ctx)
     results = kb_commands.search_knowledge(query, db_path=db_path, limit=limit)
     if json_output:
@@ -747,6 +854,8 @@ def kb_validate(
     refresh: bool = typer.Option(True, "--refresh/--no-refresh", help="Reindex before running validation queries"),
     json_output: bool = typer.Option(False, "--json", help="Return JSON payload"),
 ) -> None:
+    from . import kb as kb_commands
+
     db_path = _ensure_context(ctx)
     report = kb_commands.validate_queries(
         db_path=db_path,
@@ -781,349 +890,296 @@ def hook_install(
         help="Overwrite an existing hook if present",
     ),
 ) -> None:
+    from . import _hook_template
+
     db_path = _ensure_context(ctx)
     repo_root = Path.cwd()
-    if db_path.is_absolute():
-        db_path_abs = db_path.resolve()
-    else:
-        db_path_abs = (repo_root / db_path).resolve()
+    # Joining an absolute path onto repo_root yields that path unchanged.
+    db_path_abs = (repo_root / db_path).resolve()
     db_path_literal = json.dumps(str(db_path_abs))
-    git_dir = repo_root / ".git"
-    if not git_dir.exists():
+    if not (repo_root / ".git").exists():
         typer.echo("Git directory not found. Run this command from the repository root.")
         raise typer.Exit(code=1)
 
-    hook_path = path if path.is_absolute() else repo_root / path
-    hooks_dir = hook_path.parent
-    hooks_dir.mkdir(parents=True, exist_ok=True)
-
-    if hook_path.exists() and not force:
+    hook_path = repo_root / path
+    if not force and hook_path.exists():
         typer.echo(f"Hook already exists at {hook_path}. Use --force to overwrite.")
         raise typer.Exit(code=1)
+    hook_path.parent.mkdir(parents=True, exist_ok=True)
 
-    script_template = textwrap.dedent(
-        """\
-        #!/usr/bin/env python3
-        from __future__ import annotations
+    queue_path_literal = json.dumps(str(db_commands.session_queue_path(db_path_abs)))
+    script = _hook_template.TEMPLATE.replace("__DB_PATH__", db_path_literal).replace(
+        "__QUEUE_PATH__", queue_path_literal
+    )
 
-        import json
-        import sqlite3
-        import subprocess
-        import sys
-        from pathlib import Path
+    hook_path.write_text(script, encoding="utf-8")
+    hook_path.chmod(0o755)
+    typer.echo(f"Installed post-commit hook at {hook_path}")
 
-        REPO_ROOT = Path(__file__).resolve().parent.parent.parent
-        DB_PATH = Path(__DB_PATH__)
 
+def _backlog_cache_path(backlog_path: Path) -> Path:
+    return backlog_path.with_name(backlog_path.name + ".cache.json")
 
-        def _run(cmd: list[str]) -> str:
-            return subprocess.check_output(cmd, text=True, cwd=str(REPO_ROOT)).strip()
 
+def _read_backlog_cache(cache_path: Path, cache_key: str) -> list[dict[str, str | None]] | None:
+    try:
+        with cache_path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("version") != _BACKLOG_CACHE_VERSION or payload.get("key") != cache_key:
+        return None
+    missions = payload.get("missions")
+    return missions if isinstance(missions, list) else None
 
-        def _changed_files() -> list[str]:
-            output = _run(["git", "diff-tree", "--no-commit-id", "--name-only", "-r", "HEAD"])
-            return [line for line in output.splitlines() if line]
 
+def _write_backlog_cache(cache_path: Path, cache_key: str, missions: list[dict[str, str | None]]) -> None:
+    payload = {"version": _BACKLOG_CACHE_VERSION, "key": cache_key, "missions": missions}
+    try:
+        serialized = json.dumps(payload, ensure_ascii=False)
+    except (TypeError, ValueError):
+        # YAML can yield values JSON cannot represent (e.g. unquoted dates); skip caching.
+        return
+    try:
+        replace_file_text(cache_path, serialized)
+    except OSError:
+        # The cache is an optimization only; read-only checkouts simply skip it.
+        pass
 
-        def _active_mission() -> str | None:
-            if not DB_PATH.exists():
-                return None
-            conn = sqlite3.connect(DB_PATH)
-            try:
-                conn.row_factory = sqlite3.Row
-                query = \"\"\"
-                    SELECT id
-                    FROM missions
-                    WHERE status = ?
-                    ORDER BY datetime(created_at) ASC, id ASC
-                    LIMIT 1
-                \"\"\"
-                row = conn.execute(query, ("In Progress",)).fetchone()
-                if row is None:
-                    row = conn.execute(query, ("Current",)).fetchone()
-                return row["id"] if row else None
-            finally:
-                conn.close()
-
-
-        def main() -> None:
-            try:
-                commit_hash = _run(["git", "rev-parse", "HEAD"])
-                commit_message = _run(["git", "log", "-1", "--pretty=%s", "HEAD"])
-                files = _changed_files()
-                mission_id = _active_mission()
 
-                details = {"hash": commit_hash, "files": files}
-                if mission_id:
-                    details["mission"] = mission_id
-
-                cmd = [
-                    sys.executable,
-                    "-m",
-                    "cmosctl",
-                    "session",
-                    "log",
-                    "--type",
-                    "commit",
-                    "--agent",
-                    "git-hook",
-                    "--summary",
-                    commit_message,
-                    "--details",
-                    json.dumps(details),
-                ]
-                if mission_id:
-                    cmd.extend(["--mission", mission_id])
-
-                subprocess.run(
-                    cmd,
-                    cwd=str(REPO_ROOT),
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
-            except subprocess.CalledProcessError as exc:
-                sys.stderr.write("[cmos hook] failed to log commit session\\n")
-                if exc.stderr:
-                    sys.stderr.write(exc.stderr + "\\n")
-            except Exception as exc:  # pragma: no cover - defensive fallback
-                sys.stderr.write(f"[cmos hook] unexpected error: {exc}\\n")
-
-
-        if __name__ == "__main__":
-            main()
-        """
-    )
+def _load_missions_from_backlog(backlog_path: Path) -> list[dict[str, str | None]]:
+    try:
+        stat = backlog_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Backlog file not found at {backlog_path}") from None
+
+    # Reuse the parsed missions while the YAML file's mtime and size are unchanged.
+    cache_key = f"{stat.st_mtime_ns}:{stat.st_size}"
+    cache_path = _backlog_cache_path(backlog_path)
+    cached = _read_backlog_cache(cache_path, cache_key)
+    if cached is not None:
+        return cached
+
+    missions = _parse_missions_from_backlog(backlog_path)
+    _write_backlog_cache(cache_path, cache_key, missions)
+    return missions
 
-    script = script_template.replace("__DB_PATH__", db_path_literal)
 
-    hook_path.write_text(script, encoding="utf-8")
-    hook_path.chmod(0o755)
-    typer.echo(f"Installed post-commit hook at {hook_path}")
+def _parse_missions_from_backlog(backlog_path: Path) -> list[dict[str, str | None]]:
+    import yaml
+
+    missions: list[dict[str, str | None]] = []
+    append = missions.append
+    canonical = _CANONICAL_STATUSES
+    # Backlogs are small: one read hands libyaml the whole buffer instead of
+    # feeding it through repeated Python-level reads of a text stream.
+    data = backlog_path.read_bytes()
+    for sprint_id, raw_mission in _iter_backlog_missions(yaml.load_all(data, Loader=yaml_loader())):
+        mission_id = raw_mission.get("id")
+        name = raw_mission.get("name")
+        status = raw_mission.get("status", "Queued")
+        if not isinstance(status, str):
+            normalized_status = None
+        elif status in canonical:
+            normalized_status = status
+        else:
+            normalized_status = _STATUS_LOOKUP.get(status.translate(_STATUS_SQUASH).lower())
+        if normalized_status is None:
+            raise ValueError(f"Mission {mission_id!r} uses unsupported status {status!r}.")
+        if not mission_id or not name:
+            raise ValueError("Mission entries must include 'id' and 'name'.")
+        append(
+            {
+                "id": mission_id,
+                "sprint_id": sprint_id,
+                "name": name,
+                "status": normalized_status,
+                "completed_at": raw_mission.get("completed_at"),
+                "notes": raw_mission.get("notes"),
+            }
+        )
 
+    return missions
 
-def _load_missions_from_backlog(backlog_path: Path) -> list[dict[str, str | None]]:
-    if not backlog_path.exists():
-        raise FileNotFoundError(f"Backlog file not found at {backlog_path}")
 
-    missions: list[dict[str, str | None]] = []
-    with backlog_path.open("r", encoding="utf-8") as handle:
-        for doc in yaml.safe_load_all(handle):
-            if not isinstance(doc, dict):
-                continue
-            domain_fields = doc.get("domainFields")
-            if not isinstance(domain_fields, dict):
+def _iter_backlog_missions(docs: Iterable[Any]) -> Iterator[tuple[Any, dict[str, Any]]]:
+    """Flatten backlog documents into ``(sprint_id, raw_mission)`` pairs."""
+    for doc in docs:
+        if not isinstance(doc, dict):
+            continue
+        domain_fields = doc.get("domainFields")
+        if not isinstance(domain_fields, dict):
+            continue
+        for sprint in domain_fields.get("sprints") or []:
+            if not isinstance(sprint, dict):
                 continue
-            sprints = domain_fields.get("sprints") or []
-            for sprint in sprints:
-                if not isinstance(sprint, dict):
-                    continue
-                sprint_id = sprint.get("sprintId")
-                for raw_mission in sprint.get("missions") or []:
-                    if not isinstance(raw_mission, dict):
-                        continue
-                    mission_id = raw_mission.get("id")
-                    name = raw_mission.get("name")
-                    status = raw_mission.get("status", "Queued")
-                    normalized_status = STATUS_NORMALIZATION.get(status)
-                    if normalized_status is None:
-                        raise ValueError(f"Mission {mission_id!r} uses unsupported status {status!r}.")
-                    if not mission_id or not name:
-                        raise ValueError("Mission entries must include 'id' and 'name'.")
-                    missions.append(
-                        {
-                            "id": mission_id,
-                            "sprint_id": sprint_id,
-                            "name": name,
-                            "status": normalized_status,
-                            "completed_at": raw_mission.get("completed_at"),
-                            "notes": raw_mission.get("notes"),
-                        }
-                    )
+            sprint_id = sprint.get("sprintId")
+            for raw_mission in sprint.get("missions") or []:
+                if isinstance(raw_mission, dict):
+                    yield sprint_id, raw_mission
 
-    return missions
 
+def _load_backlog_template(backlog_path: Path, *, mutable: bool = True) -> BacklogTemplate:
+    """Return the parsed backlog template, reusing earlier parses of an unchanged file.
 
-def _extract_header(text: str) -> str:
-    header_lines: list[str] = []
-    for line in text.splitlines():
-        if line.startswith("#"):
-            header_lines.append(line)
-        else:
-            break
-    return "\n".join(header_lines)
+    Parsed templates are shared, so callers that modify the result must keep the
+    default ``mutable=True`` to receive a private deep copy.
+    """
+    try:
+        stat = backlog_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Backlog file not found at {backlog_path}") from None
+
+    template = _parse_backlog_template(os.fspath(backlog_path), stat.st_mtime_ns, stat.st_size)
+    if mutable:
+        import copy
 
+        # A single deepcopy keeps ``sprints`` pointing into the copied docs.
+        template = copy.deepcopy(template)
+    return template
 
-def _load_backlog_template(backlog_path: Path) -> BacklogTemplate:
-    if not backlog_path.exists():
-        raise FileNotFoundError(f"Backlog file not found at {backlog_path}")
 
-    raw_text = backlog_path.read_text(encoding="utf-8")
-    header = _extract_header(raw_text)
-    docs = list(yaml.safe_load_all(raw_text))
+@lru_cache(maxsize=8)
+def _parse_backlog_template(path: str, mtime_ns: int, size: int) -> BacklogTemplate:
+    # mtime_ns and size only key the cache so edits to the file invalidate it.
+    backlog_path = Path(path)
+    header, docs = load_yaml_documents(backlog_path)
     if not docs:
         raise ValueError(f"Backlog file at {backlog_path} is empty.")
     if len(docs) < 2:
         docs.append({})
+    sprints = _normalize_backlog_docs(docs)
 
-    sprint_map: dict[str, dict[str, Any]] = {}
-    sprint_order: list[str] = []
-    second_doc = docs[1] if isinstance(docs[1], dict) else {}
-    domain_fields = second_doc.get("domainFields") if isinstance(second_doc, dict) else {}
-    if isinstance(domain_fields, dict):
-        for sprint in domain_fields.get("sprints") or []:
-            if not isinstance(sprint, dict):
-                continue
-            sprint_id = sprint.get("sprintId")
-            if sprint_id and sprint_id not in sprint_map:
-                sprint_map[sprint_id] = sprint
-                sprint_order.append(sprint_id)
-
-    return BacklogTemplate(header=header, docs=docs, sprint_order=sprint_order, sprint_map=sprint_map)
-
-
-def _derive_sprint_status(original_status: str | None, mission_statuses: Sequence[str | None]) -> str:
-    statuses = {status for status in mission_statuses if status}
-    if not statuses:
-        return original_status or "Queued"
-    if statuses == {"Completed"}:
-        return "Completed"
-    if "Blocked" in statuses:
-        return "Blocked"
-    if "In Progress" in statuses:
-        return "In Progress"
-    if "Current" in statuses:
-        return "Current"
-    if statuses == {"Queued"}:
-        if original_status and original_status.lower() == "planned":
-            return original_status
-        return "Queued"
-    if statuses == {"Completed", "Queued"}:
-        return "In Progress"
-    return original_status or "In Progress"
+    sprint_index: dict[str, int] = {}
+    for position, sprint in enumerate(sprints):
+        if not isinstance(sprint, dict):
+            continue
+        sprint_id = sprint.get("sprintId")
+        if sprint_id and sprint_id not in sprint_index:
+            sprint_index[sprint_id] = position
 
+    return BacklogTemplate(header=header, docs=docs, sprints=sprints, sprint_index=sprint_index)
 
-def _apply_missions_to_backlog(template: BacklogTemplate, missions: Sequence[db_commands.Mission]) -> None:
-    if not template.docs:
-        return
 
-    if len(template.docs) < 2 or not isinstance(template.docs[1], dict):
-        template.docs.append({"domainFields": {"sprints": []}})
-    second_doc = template.docs[1]
-    if not isinstance(second_doc, dict):
-        second_doc = {}
-        template.docs[1] = second_doc
+def _normalize_backlog_docs(docs: list[Any]) -> list[Any]:
+    """Give docs[1] the ``domainFields.sprints[*].missions`` shape and return its sprints.
 
-    domain_fields = second_doc.setdefault("domainFields", {})
+    Doing this once per parse lets the export path walk the structure without
+    re-validating every container on each run.
+    """
+    second_doc = docs[1]
+    if not isinstance(second_doc, dict):
+        second_doc = docs[1] = {}
+    domain_fields = second_doc.get("domainFields")
     if not isinstance(domain_fields, dict):
-        domain_fields = {}
-        second_doc["domainFields"] = domain_fields
+        domain_fields = second_doc["domainFields"] = {}
+    sprints = domain_fields.get("sprints")
+    if not isinstance(sprints, list):
+        sprints = domain_fields["sprints"] = []
+    for sprint in sprints:
+        if isinstance(sprint, dict) and not isinstance(sprint.get("missions"), list):
+            sprint["missions"] = []
+    return sprints
 
-    sprints_list = domain_fields.setdefault("sprints", [])
-    if not isinstance(sprints_list, list):
-        sprints_list = []
-        domain_fields["sprints"] = sprints_list
 
+def _apply_missions_to_backlog(template: BacklogTemplate, missions: Sequence[db_commands.Mission]) -> None:
+    # The loader normalized the container shapes and indexed every sprint already.
+    sprints_list = template.sprints
+    sprint_index = template.sprint_index
+
+    mission_status_lookup: dict[str, str] = {}
+    missions_by_sprint: dict[str, list[db_commands.Mission]] = defaultdict(list)
+    for mission in missions:
+        mission_status_lookup[mission.id] = mission.status
+        missions_by_sprint[mission.sprint_id or "Unassigned"].append(mission)
+
+    # Each entry's final status is known before any update (the database status,
+    # else its own), so one pass indexes the entries and collects sprint statuses.
+    # sprint_statuses runs parallel to sprints_list; None marks non-mapping items.
+    status_of = mission_status_lookup.get
     mission_entry_map: dict[str, dict[str, Any]] = {}
+    sprint_statuses: list[list[str | None] | None] = []
     for sprint in sprints_list:
         if not isinstance(sprint, dict):
+            sprint_statuses.append(None)
             continue
-        sprint_id = sprint.get("sprintId")
-        if sprint_id and sprint_id not in template.sprint_map:
-            template.sprint_map[sprint_id] = sprint
-        if sprint_id and sprint_id not in template.sprint_order:
-            template.sprint_order.append(sprint_id)
-        missions_list = sprint.setdefault("missions", [])
-        if not isinstance(missions_list, list):
-            missions_list = []
-            sprint["missions"] = missions_list
-        for item in missions_list:
+        statuses: list[str | None] = []
+        for item in sprint["missions"]:
             if isinstance(item, dict):
                 mission_id = item.get("id")
                 if mission_id:
                     mission_entry_map[mission_id] = item
-
-    mission_status_lookup = {mission.id: mission.status for mission in missions}
-
-    for mission in missions:
-        sprint_id = mission.sprint_id or "Unassigned"
-        sprint = template.sprint_map.get(sprint_id)
-        if sprint is None:
+                statuses.append(status_of(mission_id, item.get("status")))
+        sprint_statuses.append(statuses)
+
+    # Sprint-level lookups happen once per sprint; only the entry updates are per mission.
+    for sprint_id, sprint_missions in missions_by_sprint.items():
+        position = sprint_index.get(sprint_id)
+        if position is not None:
+            sprint = sprints_list[position]
+        else:
             sprint = {
                 "sprintId": sprint_id,
-                "title": mission.sprint_id or sprint_id,
+                "title": sprint_missions[0].sprint_id or sprint_id,
                 "focus": "",
                 "status": "Queued",
                 "missions": [],
             }
+            position = sprint_index[sprint_id] = len(sprints_list)
             sprints_list.append(sprint)
-            template.sprint_map[sprint_id] = sprint
-        if sprint_id not in template.sprint_order:
-            template.sprint_order.append(sprint_id)
-
-        missions_list = sprint.setdefault("missions", [])
-        if not isinstance(missions_list, list):
-            missions_list = []
-            sprint["missions"] = missions_list
-
-        mission_entry = mission_entry_map.get(mission.id)
-        if mission_entry is None:
-            mission_entry = {"id": mission.id, "name": mission.name}
-            missions_list.append(mission_entry)
-            mission_entry_map[mission.id] = mission_entry
-        else:
-            mission_entry["name"] = mission.name
-
-        mission_entry["status"] = mission.status
-        if mission.completed_at:
-            mission_entry["completed_at"] = mission.completed_at
-        else:
-            mission_entry.pop("completed_at", None)
-
-        if mission.notes:
-            mission_entry["notes"] = mission.notes
-        else:
-            mission_entry.pop("notes", None)
-
-    for sprint in sprints_list:
-        missions_list = sprint.get("missions") or []
-        statuses = [
-            mission_status_lookup.get(item.get("id"), item.get("status"))
-            for item in missions_list
-            if isinstance(item, dict)
-        ]
-        sprint["status"] = _derive_sprint_status(sprint.get("status"), statuses)
-
-
-def _parse_details_field(details: str | None) -> Any:
-    if details is None:
-        return None
-    text = details.strip()
-    if not text:
-        return None
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        return text
-
-
-def _session_to_export_record(session: db_commands.Session) -> dict[str, Any]:
-    record: dict[str, Any] = {
-        "ts": session.ts,
-        "action": session.action,
-        "status": SESSION_STATUS_FROM_ACTION.get(session.action, session.action),
-    }
-    if session.mission_id:
-        record["mission"] = session.mission_id
-    if session.agent:
-        record["agent"] = session.agent
-    if session.summary:
-        record["summary"] = session.summary
-    details = _parse_details_field(session.details)
-    if details is not None:
-        record["details"] = details
-    return record
+            sprint_statuses.append([])
+
+        missions_list = sprint["missions"]
+        statuses = sprint_statuses[position]
+        for mission in sprint_missions:
+            mission_entry = mission_entry_map.get(mission.id)
+            if mission_entry is None:
+                mission_entry = {"id": mission.id, "name": mission.name}
+                missions_list.append(mission_entry)
+                mission_entry_map[mission.id] = mission_entry
+                statuses.append(mission.status)
+            else:
+                mission_entry["name"] = mission.name
+
+            mission_entry["status"] = mission.status
+            if mission.completed_at:
+                mission_entry["completed_at"] = mission.completed_at
+            else:
+                mission_entry.pop("completed_at", None)
+
+            if mission.notes:
+                mission_entry["notes"] = mission.notes
+            else:
+                mission_entry.pop("notes", None)
+
+    for sprint, statuses in zip(sprints_list, sprint_statuses):
+        if statuses is not None:
+            sprint["status"] = derive_sprint_status(sprint.get("status"), statuses)
+
+
+def _session_export_records(sessions: Iterable[db_commands.Session]) -> Iterator[dict[str, Any]]:
+    # Globals used per session are bound to locals once for the whole export.
+    status_for = SESSION_STATUS_FROM_ACTION.get
+    parse_details = parse_details_field
+    for session in sessions:
+        action = session.action
+        record: dict[str, Any] = {
+            "ts": session.ts,
+            "action": action,
+            "status": status_for(action, action),
+        }
+        if session.mission_id:
+            record["mission"] = session.mission_id
+        if session.agent:
+            record["agent"] = session.agent
+        if session.summary:
+            record["summary"] = session.summary
+        details = parse_details(session.details)
+        if details is not None:
+            record["details"] = details
+        yield record
 
 
 def _load_sessions_from_jsonl(source: Path) -> list[dict[str, Any]]:
@@ -1137,7 +1193,7 @@ def _load_sessions_from_jsonl(source: Path) -> list[dict[str, Any]]:
             if not text:
                 continue
             try:
-                payload = json.loads(text)
+                payload = json_loads(text)
             except json.JSONDecodeError as exc:
                 raise ValueError(f"Invalid JSON on line {index}: {exc}") from exc
             if not isinstance(payload, dict):
@@ -1160,90 +1216,100 @@ def _mission_summary(mission: db_commands.Mission | None) -> dict[str, Any] | No
 
 
 def _build_status_snapshot(
-    db_path: Path,
+    conn: sqlite3.Connection,
     *,
     backlog_path: Path | None = None,
     recent_limit: int = 5,
+    include_mission_details: bool = True,
 ) -> dict[str, Any]:
-    with db_commands.connect(db_path) as conn:
-        missions = db_commands.list_missions(conn)
-        active_mission = db_commands.get_in_progress_mission(conn)
-        current_mission = active_mission or db_commands.get_current_mission(conn)
-        next_candidate = db_commands.get_next_queued_mission(conn)
-        sessions = db_commands.list_sessions(conn)
+    """Summarize missions, sprints and recent sessions for ``status`` and ``context``.
+
+    Each sprint summary carries a ``missions`` list only when
+    *include_mission_details* is true; callers that print counts alone skip
+    building one dict per mission.
+    """
+    missions = db_commands.list_missions(conn)
+    active_mission = db_commands.get_in_progress_mission(conn)
+    current_mission = active_mission or db_commands.get_current_mission(conn)
+    next_candidate = db_commands.get_next_queued_mission(conn)
+    session_count = db_commands.count_sessions(conn)
+    recent = db_commands.list_recent_sessions(conn, recent_limit if recent_limit > 0 else None)
 
     template: BacklogTemplate | None = None
-    if backlog_path and backlog_path.exists():
+    if backlog_path:
+        # A missing file raises FileNotFoundError from the single stat in the loader.
         try:
-            template = _load_backlog_template(backlog_path)
+            template = _load_backlog_template(backlog_path, mutable=False)
         except (FileNotFoundError, ValueError):
             template = None
 
+    # Insertion order of sprint_meta is the sprint order: backlog sprints first,
+    # then any sprint only referenced by missions.
     sprint_meta: dict[str, dict[str, Any]] = {}
-    sprint_order: list[str] = []
     if template is not None:
-        sprint_order = list(template.sprint_order)
-        for sprint_id, sprint in template.sprint_map.items():
+        for sprint_id, position in template.sprint_index.items():
+            sprint = template.sprints[position]
             sprint_meta[sprint_id] = {
                 "title": sprint.get("title"),
                 "focus": sprint.get("focus"),
                 "status": sprint.get("status"),
             }
 
+    # One pass builds the per-sprint groups together with overall and per-sprint status counts.
     mission_groups: dict[str, list[db_commands.Mission]] = defaultdict(list)
+    totals: Counter[str] = Counter()
+    sprint_counts: dict[str, Counter[str]] = defaultdict(Counter)
     for mission in missions:
         sprint_id = mission.sprint_id or "Unassigned"
-        mission_groups[sprint_id].append(mission)
+        status = mission.status
+        if include_mission_details:
+            mission_groups[sprint_id].append(mission)
+        totals[status] += 1
+        sprint_counts[sprint_id][status] += 1
         if sprint_id not in sprint_meta:
             sprint_meta[sprint_id] = {
                 "title": mission.sprint_id or sprint_id,
                 "focus": None,
                 "status": None,
             }
-        if sprint_id not in sprint_order:
-            sprint_order.append(sprint_id)
 
-    totals = Counter(mission.status for mission in missions)
     sprint_summaries: list[dict[str, Any]] = []
-    for sprint_id in sprint_order:
-        bucket = mission_groups.get(sprint_id, [])
-        counts = Counter(m.status for m in bucket)
-        aggregated_status = _derive_sprint_status(
-            sprint_meta.get(sprint_id, {}).get("status"),
-            [mission.status for mission in bucket],
-        )
-        sprint_summaries.append(
-            {
-                "sprint_id": sprint_id,
-                "title": sprint_meta.get(sprint_id, {}).get("title"),
-                "focus": sprint_meta.get(sprint_id, {}).get("focus"),
-                "status": aggregated_status,
-                "counts": dict(counts),
-                "missions": [
-                    {
-                        "id": mission.id,
-                        "name": mission.name,
-                        "status": mission.status,
-                        "completed_at": mission.completed_at,
-                        "notes": mission.notes,
-                    }
-                    for mission in bucket
-                ],
-            }
-        )
-
-    sessions_sorted = sorted(sessions, key=lambda entry: (entry.ts, entry.id), reverse=True)
+    for sprint_id, meta in sprint_meta.items():
+        counts = sprint_counts.get(sprint_id, {})
+        # The distinct statuses are exactly the keys of the per-sprint counter.
+        aggregated_status = derive_sprint_status(meta["status"], list(counts))
+        summary: dict[str, Any] = {
+            "sprint_id": sprint_id,
+            "title": meta["title"],
+            "focus": meta["focus"],
+            "status": aggregated_status,
+            "counts": dict(counts),
+        }
+        if include_mission_details:
+            summary["missions"] = [
+                {
+                    "id": mission.id,
+                    "name": mission.name,
+                    "status": mission.status,
+                    "completed_at": mission.completed_at,
+                    "notes": mission.notes,
+                }
+                for mission in mission_groups.get(sprint_id, [])
+            ]
+        sprint_summaries.append(summary)
+
+    status_for = SESSION_STATUS_FROM_ACTION.get
     recent_sessions = [
         {
             "id": entry.id,
             "ts": entry.ts,
             "mission": entry.mission_id,
             "action": entry.action,
-            "status": SESSION_STATUS_FROM_ACTION.get(entry.action, entry.action),
+            "status": status_for(entry.action, entry.action),
             "agent": entry.agent,
             "summary": entry.summary,
         }
-        for entry in sessions_sorted[: recent_limit if recent_limit > 0 else None]
+        for entry in recent
     ]
 
     next_mission = next_candidate
@@ -1254,7 +1320,7 @@ def _build_status_snapshot(
         "generated_at": db_commands.utc_now_iso(),
         "totals": {
             "missions": len(missions),
-            "sessions": len(sessions),
+            "sessions": session_count,
             "by_status": dict(totals),
         },
         "active_mission": _mission_summary(active_mission),
@@ -1266,41 +1332,37 @@ def _build_status_snapshot(
 
 
 def _export_backlog_file(
-    db_path: Path,
+    conn: sqlite3.Connection,
     *,
     output: Path,
     template_path: Path,
 ) -> int:
     template = _load_backlog_template(template_path)
-    with db_commands.connect(db_path) as conn:
-        missions = db_commands.list_missions(conn)
+    missions = db_commands.list_missions(conn)
 
     _apply_missions_to_backlog(template, missions)
 
     output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("w", encoding="utf-8") as handle:
-        if template.header:
-            handle.write(template.header.rstrip() + "\n")
-        yaml.safe_dump_all(template.docs, handle, sort_keys=False)
+    write_yaml_documents(output, template.header, template.docs)
     return len(missions)
 
 
 def _export_sessions_file(
-    db_path: Path,
+    conn: sqlite3.Connection,
     *,
     output: Path,
 ) -> int:
-    with db_commands.connect(db_path) as conn:
-        sessions = db_commands.list_sessions(conn)
-
-    sessions_sorted = sorted(sessions, key=lambda entry: (entry.ts, entry.id))
     output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("w", encoding="utf-8") as handle:
-        for session in sessions_sorted:
-            record = _session_to_export_record(session)
-            json.dump(record, handle, ensure_ascii=False)
-            handle.write("\n")
-    return len(sessions_sorted)
+    encode = _JSONL_ENCODE
+    count = 0
+    # A 1 MiB buffer turns the per-record writes into a few large write syscalls.
+    with output.open("w", encoding="utf-8", buffering=_EXPORT_BUFFER_SIZE) as handle:
+        write = handle.write
+        # Rows stream from SQLite already in export order.
+        for record in _session_export_records(db_commands.iter_sessions_chronological(conn)):
+            write(encode(record) + "\n")
+            count += 1
+    return count
 
 
 @export_app.command("backlog")
@@ -1319,9 +1381,9 @@ def export_backlog(
         help="Backlog template used for metadata (default: cmos/missions/backlog.yaml)",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
+    conn = _connection(ctx)
     try:
-        mission_count = _export_backlog_file(db_path, output=output, template_path=template)
+        mission_count = _export_backlog_file(conn, output=output, template_path=template)
     except (FileNotFoundError, ValueError) as exc:
         typer.echo(str(exc))
         raise typer.Exit(code=1) from exc
@@ -1338,8 +1400,8 @@ def export_sessions(
         help="Destination for the exported sessions JSONL file (default: cmos/SESSIONS.jsonl)",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    session_count = _export_sessions_file(db_path, output=output)
+    conn = _connection(ctx, drain_sessions=True)
+    session_count = _export_sessions_file(conn, output=output)
     typer.echo(f"Exported {session_count} sessions to {output}")
 
 
@@ -1363,13 +1425,13 @@ def export_all(
         help="Backlog template used for metadata (default: cmos/missions/backlog.yaml)",
     ),
 ) -> None:
-    db_path = _ensure_context(ctx)
+    conn = _connection(ctx, drain_sessions=True)
     try:
-        mission_count = _export_backlog_file(db_path, output=backlog_output, template_path=template)
+        mission_count = _export_backlog_file(conn, output=backlog_output, template_path=template)
     except (FileNotFoundError, ValueError) as exc:
         typer.echo(str(exc))
         raise typer.Exit(code=1) from exc
-    session_count = _export_sessions_file(db_path, output=sessions_output)
+    session_count = _export_sessions_file(conn, output=sessions_output)
     typer.echo(
         f"Exported backlog ({mission_count} missions) to {backlog_output} "
         f"and sessions ({session_count} entries) to {sessions_output}"
@@ -1385,7 +1447,6 @@ def db_import(
         typer.echo(f"File not found: {source}")
         raise typer.Exit(code=1)
 
-    db_path = _ensure_context(ctx)
     suffix = source.suffix.lower()
 
     if suffix in {".yaml", ".yml"}:
@@ -1397,8 +1458,8 @@ def db_import(
         if not missions:
             typer.echo("No missions found in backlog file; database not modified.")
             raise typer.Exit(code=1)
-        with db_commands.connect(db_path) as conn:
-            db_commands.replace_missions(conn, missions)
+        conn = _connection(ctx)
+        db_commands.replace_missions(conn, missions)
         typer.echo(f"Imported {len(missions)} missions from {source}")
         return
 
@@ -1412,8 +1473,8 @@ def db_import(
             typer.echo("No sessions found in JSONL file; database not modified.")
             raise typer.Exit(code=1)
         try:
-            with db_commands.connect(db_path) as conn:
-                db_commands.replace_sessions(conn, sessions)
+            conn = _connection(ctx)
+            db_commands.replace_sessions(conn, sessions)
         except ValueError as exc:
             typer.echo(f"Failed to import sessions: {exc}")
             raise typer.Exit(code=1) from exc
@@ -1435,33 +1496,39 @@ def status_command(
     ),
     recent: int = typer.Option(5, "--recent", help="Number of recent sessions to summarize (default: 5)"),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    backlog_path = backlog if backlog.exists() else None
-    snapshot = _build_status_snapshot(db_path, backlog_path=backlog_path, recent_limit=recent)
+    conn = _connection(ctx)
+    # A missing backlog is detected by the loader's own stat call.
+    snapshot = _build_status_snapshot(
+        conn, backlog_path=backlog, recent_limit=recent, include_mission_details=verbose
+    )
+
+    # Lines are collected and echoed together so the report is written at once.
+    lines: list[str] = []
+    emit = lines.append
 
     active = snapshot["active_mission"]
     current = snapshot["current_mission"]
     next_mission = snapshot["next_mission"]
 
     if active:
-        typer.echo(f"Active mission: {active['id']} [{active['status']}] - {active['name']}")
+        emit(f"Active mission: {active['id']} [{active['status']}] - {active['name']}")
     elif current:
-        typer.echo(f"Current mission: {current['id']} [{current['status']}] - {current['name']}")
+        emit(f"Current mission: {current['id']} [{current['status']}] - {current['name']}")
     else:
-        typer.echo("No mission is currently active.")
+        emit("No mission is currently active.")
 
     if next_mission:
-        typer.echo(f"Next mission: {next_mission['id']} [{next_mission['status']}] - {next_mission['name']}")
+        emit(f"Next mission: {next_mission['id']} [{next_mission['status']}] - {next_mission['name']}")
 
     totals = snapshot["totals"]
     counts_summary = ", ".join(f"{status}: {count}" for status, count in sorted(totals["by_status"].items()))
     if counts_summary:
-        typer.echo(f"Missions total: {totals['missions']} ({counts_summary})")
+        emit(f"Missions total: {totals['missions']} ({counts_summary})")
     else:
-        typer.echo(f"Missions total: {totals['missions']}")
-    typer.echo(f"Sessions logged: {totals['sessions']}")
+        emit(f"Missions total: {totals['missions']}")
+    emit(f"Sessions logged: {totals['sessions']}")
 
-    typer.echo("Sprint overview:")
+    emit("Sprint overview:")
     for sprint in snapshot["sprints"]:
         title = sprint["title"] or sprint["sprint_id"]
         counts = sprint["counts"]
@@ -1469,7 +1536,7 @@ def status_command(
         summary_line = f"- {sprint['sprint_id']} ({title}) [{sprint['status']}]"
         if counts_str:
             summary_line += f" {counts_str}"
-        typer.echo(summary_line)
+        emit(summary_line)
         if verbose:
             for mission in sprint["missions"]:
                 details = f"    • {mission['id']} [{mission['status']}] {mission['name']}"
@@ -1477,14 +1544,16 @@ def status_command(
                     details += f" (completed {mission['completed_at']})"
                 elif mission["status"] == "Blocked" and mission.get("notes"):
                     details += f" – {mission['notes']}"
-                typer.echo(details)
+                emit(details)
 
     if verbose and snapshot["recent_sessions"]:
-        typer.echo("Recent sessions:")
+        emit("Recent sessions:")
         for session in snapshot["recent_sessions"]:
             summary = session.get("summary") or "-"
             mission_id = session.get("mission") or "-"
-            typer.echo(f"  - [{session['ts']}] {session['action']} {mission_id}: {summary}")
+            emit(f"  - [{session['ts']}] {session['action']} {mission_id}: {summary}")
+
+    typer.echo("\n".join(lines))
 
 
 @app.command("context")
@@ -1503,17 +1572,13 @@ def context_command(
     ),
     recent: int = typer.Option(5, "--recent", help="Number of recent sessions to include (default: 5)"),
 ) -> None:
-    db_path = _ensure_context(ctx)
-    backlog_path = backlog if backlog.exists() else None
-    snapshot = _build_status_snapshot(db_path, backlog_path=backlog_path, recent_limit=recent)
+    conn = _connection(ctx)
+    # A missing backlog is detected by the loader's own stat call.
+    snapshot = _build_status_snapshot(
+        conn, backlog_path=backlog, recent_limit=recent, include_mission_details=False
+    )
 
-    project_context: dict[str, Any] = {}
-    if DEFAULT_PROJECT_CONTEXT_PATH.exists():
-        try:
-            with DEFAULT_PROJECT_CONTEXT_PATH.open("r", encoding="utf-8") as handle:
-                project_context = json.load(handle)
-        except json.JSONDecodeError:
-            project_context = {}
+    project_context = _load_project_context(DEFAULT_PROJECT_CONTEXT_PATH)
 
     payload: dict[str, Any] = {
         "generated_at": snapshot["generated_at"],
@@ -1542,15 +1607,27 @@ def context_command(
     if "ai_instructions" in project_context:
         payload["ai_instructions"] = project_context["ai_instructions"]
 
-    json_output = json.dumps(payload, ensure_ascii=False, indent=2)
+    # Kept as bytes end to end so the orjson path never decodes its output.
+    json_output = _json_pretty_bytes(payload)
     if output:
         output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(json_output + "\n", encoding="utf-8")
+        output.write_bytes(json_output + b"\n")
         typer.echo(f"Wrote context to {output}")
     else:
         typer.echo(json_output)
 
 
+def _load_project_context(path: Path) -> dict[str, Any]:
+    """Return the parsed project context, or ``{}`` if it is missing or invalid.
+
+    The result is shared between calls for an unchanged file and must not be modified.
+    """
+    try:
+        return read_json_snapshot(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
 @mission_app.command("sync-backlog")
 def mission_sync_backlog(
     ctx: typer.Context,
@@ -1575,11 +1652,15 @@ def mission_sync_backlog(
         raise typer.Exit(code=1)
 
     db_path = _ensure_context(ctx)
-    with db_commands.connect(db_path) as conn:
-        db_commands.replace_missions(conn, missions)
+    conn = _connection(ctx)
+    db_commands.replace_missions(conn, missions)
 
-    status_counts = Counter(mission["status"] for mission in missions)
-    summary = ", ".join(f"{status}: {count}" for status, count in sorted(status_counts.items()))
+    # Pre-keyed in display order, so the distribution needs no sort afterwards.
+    status_counts = dict.fromkeys(_STATUS_DISPLAY_ORDER, 0)
+    for mission in missions:
+        status = mission["status"]
+        status_counts[status] = status_counts.get(status, 0) + 1
+    summary = ", ".join(f"{status}: {count}" for status, count in status_counts.items() if count)
     typer.echo(f"Seeded {len(missions)} missions from {source} into {db_path}.")
     typer.echo(f"Status distribution -> {summary}")
 
@@ -5,7 +5,9 @@ Database helper routines used by the CLI.
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
+import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -21,6 +23,8 @@ MISSION_STATUSES: Sequence[str] = ("Queued", "Current", "In Progress", "Complete
 SESSION_ACTIONS: Sequence[str] = ("start", "complete", "blocked", "commit")
 
 
+# Mission and Session rows are built positionally (``Mission(*row)``), so every
+# SELECT feeding them must list columns in field order.
 @dataclass(slots=True)
 class Mission:
     id: str
@@ -32,6 +36,9 @@ class Mission:
     notes: str | None
 
 
+# Session ts values are stored exactly as logged or imported. Every insert also
+# fills ts_sort with datetime(ts), so ORDER BY ts_sort matches ORDER BY datetime(ts)
+# whatever the ts format and can use idx_sessions_ts_sort.
 @dataclass(slots=True)
 class Session:
     id: int
@@ -74,12 +81,12 @@ def init_database(db_path: Path | str = DEFAULT_DB_PATH, *, force: bool = False)
     if force and db_path.exists():
         db_path.unlink()
 
-    conn = sqlite3.connect(db_path)
+    conn = schema.connect(db_path)
     try:
         schema.apply_schema(conn)
         migration_manager.apply_all(conn)
     finally:
-        conn.close()
+        schema.close_connection(conn)
 
     return db_path.resolve()
 
@@ -94,41 +101,109 @@ def ensure_database(db_path: Path | str = DEFAULT_DB_PATH) -> Path:
     return db_path
 
 
+# Absolute paths of databases this process has already migrated.
+_MIGRATED_DATABASES: set[str] = set()
+
+
+def ensure_migrated(conn: sqlite3.Connection, db_path: Path | str) -> None:
+    """Apply pending migrations to the database at *db_path* once per process."""
+    # Each database file is checked once per process; in-memory databases are
+    # fresh on every connection.
+    key = os.fspath(db_path)
+    if key == ":memory:":
+        migration_manager.apply_all(conn)
+        return
+    key = os.path.abspath(key)
+    if key not in _MIGRATED_DATABASES:
+        migration_manager.apply_all(conn)
+        _MIGRATED_DATABASES.add(key)
+
+
+def open_connection(
+    db_path: Path | str = DEFAULT_DB_PATH,
+    *,
+    drain_sessions: bool = False,
+) -> sqlite3.Connection:
+    """
+    Open a SQLite connection with the proper row factory.
+
+    With *drain_sessions*, sessions queued with :func:`queue_session` are
+    inserted first; write paths that publish the sessions table (exports, the
+    trigger session sync) ask for this. The caller owns the connection and
+    should release it with :func:`close_connection`.
+    """
+    # An existing database created by an older release is upgraded before use; a
+    # missing one is left to init_database.
+    upgrade = os.fspath(db_path) != ":memory:" and os.path.exists(db_path)
+    conn = schema.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    if upgrade:
+        ensure_migrated(conn, db_path)
+    if drain_sessions:
+        try:
+            drain_session_queue(conn, session_queue_path(db_path))
+        except (OSError, sqlite3.OperationalError):
+            # A read-only checkout or a busy writer must not block the command;
+            # the queue stays in place for the next drain or ``session sync``.
+            pass
+    return conn
+
+
+def close_connection(conn: sqlite3.Connection) -> None:
+    """Close a connection obtained from :func:`open_connection`."""
+    schema.close_connection(conn)
+
+
 @contextmanager
-def connect(db_path: Path | str = DEFAULT_DB_PATH) -> Iterator[sqlite3.Connection]:
+def connect(
+    db_path: Path | str = DEFAULT_DB_PATH,
+    *,
+    drain_sessions: bool = False,
+) -> Iterator[sqlite3.Connection]:
     """
     Context manager that yields a SQLite connection with the proper row factory.
     """
-    conn = sqlite3.connect(Path(db_path))
-    conn.row_factory = sqlite3.Row
+    conn = open_connection(db_path, drain_sessions=drain_sessions)
     try:
         yield conn
     finally:
-        conn.close()
+        schema.close_connection(conn)
 
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+# Column list in Mission field order, shared by RETURNING clauses.
+_MISSION_COLUMNS = "id, sprint_id, name, status, created_at, completed_at, notes"
+
+
 def list_missions(conn: sqlite3.Connection) -> list[Mission]:
     rows = conn.execute(
         """
         SELECT id, sprint_id, name, status, created_at, completed_at, notes
         FROM missions
-        ORDER BY datetime(created_at) ASC, id ASC
+        ORDER BY created_at ASC, id ASC
         """
     ).fetchall()
-    return [Mission(**dict(row)) for row in rows]
+    return [Mission(*row) for row in rows]
+
+
+_MISSION_STATUS_SET = frozenset(MISSION_STATUSES)
+# Statuses that at most one mission may hold at a time, in reporting order.
+_EXCLUSIVE_STATUSES = ("In Progress", "Current")
 
 
 def _detect_mission_issues(missions: Sequence[Mission]) -> list[MissionIssue]:
     issues: list[MissionIssue] = []
-    status_map: dict[str, list[Mission]] = defaultdict(list)
+    # Only the exclusive statuses are grouped; every other status needs no cross-mission check.
+    exclusive: dict[str, list[Mission]] = {status: [] for status in _EXCLUSIVE_STATUSES}
 
     for mission in missions:
         status_value = (mission.status or "").strip()
-        status_map[status_value].append(mission)
+        holders = exclusive.get(status_value)
+        if holders is not None:
+            holders.append(mission)
 
         name_value = (mission.name or "").strip()
         if not name_value:
@@ -166,7 +241,7 @@ def _detect_mission_issues(missions: Sequence[Mission]) -> list[MissionIssue]:
             )
             continue
 
-        if status_value not in MISSION_STATUSES:
+        if status_value not in _MISSION_STATUS_SET:
             issues.append(
                 MissionIssue(
                     mission=mission,
@@ -214,8 +289,7 @@ def _detect_mission_issues(missions: Sequence[Mission]) -> list[MissionIssue]:
                     )
                 )
 
-    for status_label in ("In Progress", "Current"):
-        missions_with_status = status_map.get(status_label, [])
+    for status_label, missions_with_status in exclusive.items():
         if len(missions_with_status) > 1:
             for mission in missions_with_status:
                 issues.append(
@@ -231,8 +305,18 @@ def _detect_mission_issues(missions: Sequence[Mission]) -> list[MissionIssue]:
     return issues
 
 
-def collect_mission_issues(conn: sqlite3.Connection) -> list[MissionIssue]:
-    missions = list_missions(conn)
+def collect_mission_issues(
+    conn: sqlite3.Connection,
+    missions: Sequence[Mission] | None = None,
+) -> list[MissionIssue]:
+    """
+    Audit missions for missing fields and invalid values.
+
+    Callers that already hold the result of :func:`list_missions` may pass it as
+    *missions* to avoid querying the table a second time.
+    """
+    if missions is None:
+        missions = list_missions(conn)
     return _detect_mission_issues(missions)
 
 
@@ -262,7 +346,7 @@ def get_mission(conn: sqlite3.Connection, mission_id: str) -> Mission | None:
         """,
         (mission_id,),
     ).fetchone()
-    return Mission(**dict(row)) if row else None
+    return Mission(*row) if row else None
 
 
 def get_current_mission(conn: sqlite3.Connection) -> Mission | None:
@@ -271,11 +355,11 @@ def get_current_mission(conn: sqlite3.Connection) -> Mission | None:
         SELECT id, sprint_id, name, status, created_at, completed_at, notes
         FROM missions
         WHERE status = 'Current'
-        ORDER BY datetime(created_at) ASC, id ASC
+        ORDER BY created_at ASC, id ASC
         LIMIT 1
         """
     ).fetchone()
-    return Mission(**dict(row)) if row else None
+    return Mission(*row) if row else None
 
 
 def get_in_progress_mission(conn: sqlite3.Connection) -> Mission | None:
@@ -284,11 +368,11 @@ def get_in_progress_mission(conn: sqlite3.Connection) -> Mission | None:
         SELECT id, sprint_id, name, status, created_at, completed_at, notes
         FROM missions
         WHERE status = 'In Progress'
-        ORDER BY datetime(created_at) ASC, id ASC
+        ORDER BY created_at ASC, id ASC
         LIMIT 1
         """
     ).fetchone()
-    return Mission(**dict(row)) if row else None
+    return Mission(*row) if row else None
 
 
 def get_next_queued_mission(conn: sqlite3.Connection) -> Mission | None:
@@ -297,11 +381,11 @@ def get_next_queued_mission(conn: sqlite3.Connection) -> Mission | None:
         SELECT id, sprint_id, name, status, created_at, completed_at, notes
         FROM missions
         WHERE status = 'Queued'
-        ORDER BY datetime(created_at) ASC, id ASC
+        ORDER BY created_at ASC, id ASC
         LIMIT 1
         """
     ).fetchone()
-    return Mission(**dict(row)) if row else None
+    return Mission(*row) if row else None
 
 
 def add_mission(
@@ -376,19 +460,24 @@ def complete_mission(
         (timestamp, notes, mission_id),
     )
 
-    promoted = get_next_queued_mission(conn)
-    if promoted:
-        conn.execute(
-            """
-            UPDATE missions
-            SET status = 'Current'
-            WHERE id = ?
-            """,
-            (promoted.id,),
+    # Select and promote the oldest queued mission in one statement.
+    row = conn.execute(
+        f"""
+        UPDATE missions
+        SET status = 'Current'
+        WHERE id = (
+            SELECT id
+            FROM missions
+            WHERE status = 'Queued'
+            ORDER BY created_at ASC, id ASC
+            LIMIT 1
         )
+        RETURNING {_MISSION_COLUMNS}
+        """
+    ).fetchone()
 
     conn.commit()
-    return promoted
+    return Mission(*row) if row else None
 
 
 def block_mission(conn: sqlite3.Connection, *, mission_id: str, reason: str) -> None:
@@ -454,16 +543,17 @@ def update_mission(conn: sqlite3.Connection, *, mission_id: str, **fields: Any)
     params = list(updates.values())
     params.append(mission_id)
 
-    conn.execute(
+    row = conn.execute(
         f"""
         UPDATE missions
         SET {assignments}
         WHERE id = ?
+        RETURNING {_MISSION_COLUMNS}
         """,
         params,
-    )
+    ).fetchone()
     conn.commit()
-    return get_mission(conn, mission_id)
+    return Mission(*row)
 
 
 def utc_now_iso() -> str:
@@ -481,23 +571,26 @@ def _normalize_session_action(action: str) -> str:
     return normalized
 
 
+# Session status spellings accepted on import, mapped to their action. Every
+# SESSION_ACTIONS value maps to itself, so one lookup resolves any input.
+_STATUS_TO_ACTION: dict[str, str] = {
+    "in_progress": "start",
+    "started": "start",
+    "start": "start",
+    "complete": "complete",
+    "completed": "complete",
+    "done": "complete",
+    "blocked": "blocked",
+    "commit": "commit",
+    "committed": "commit",
+    "commit_logged": "commit",
+}
+
+
 def _status_to_action(status: str | None) -> str | None:
-    if status is None:
+    if not isinstance(status, str):
         return None
-    normalized = status.strip().lower()
-    mapping = {
-        "in_progress": "start",
-        "started": "start",
-        "start": "start",
-        "complete": "complete",
-        "completed": "complete",
-        "done": "complete",
-        "blocked": "blocked",
-        "commit": "commit",
-        "committed": "commit",
-        "commit_logged": "commit",
-    }
-    return mapping.get(normalized, normalized if normalized in SESSION_ACTIONS else None)
+    return _STATUS_TO_ACTION.get(status.strip().lower())
 
 
 def log_session(
@@ -519,8 +612,8 @@ def log_session(
 
     cursor = conn.execute(
         """
-        INSERT INTO sessions (ts, mission_id, action, agent, summary, details)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO sessions (ts, ts_sort, mission_id, action, agent, summary, details)
+        VALUES (?1, datetime(?1), ?2, ?3, ?4, ?5, ?6)
         """,
         (timestamp, mission_value, normalized_action, agent_value, summary_value, details_value),
     )
@@ -528,8 +621,167 @@ def log_session(
     return int(cursor.lastrowid)
 
 
-def list_sessions(conn: sqlite3.Connection, *, mission_id: str | None = None) -> list[Session]:
-    params: list[str] = []
+def session_queue_path(db_path: Path | str = DEFAULT_DB_PATH) -> Path:
+    """
+    Return the JSONL file that holds sessions queued for *db_path*.
+    """
+    return Path(db_path).with_suffix(".pending-sessions.jsonl")
+
+
+def queue_session(
+    queue_path: Path | str,
+    *,
+    action: str,
+    mission_id: str | None = None,
+    agent: str | None = None,
+    summary: str | None = None,
+    details: str | None = None,
+    ts: str | None = None,
+) -> None:
+    """
+    Append a session record to the pending queue instead of the database.
+
+    Queued records are inserted in one batch by :func:`drain_session_queue`,
+    which runs on ``session sync`` and before sessions are exported or synced
+    by the triggers.
+    """
+    record = {
+        "ts": ts or _utc_now_iso(),
+        "action": _normalize_session_action(action),
+        "mission_id": mission_id,
+        "agent": agent,
+        "summary": summary,
+        "details": details,
+    }
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    queue_path = Path(queue_path)
+    queue_path.parent.mkdir(parents=True, exist_ok=True)
+    # A single append-mode write keeps concurrent writers from interleaving lines.
+    with queue_path.open("a", encoding="utf-8") as handle:
+        handle.write(line)
+
+
+def drain_session_queue(conn: sqlite3.Connection, queue_path: Path | str, *, recover: bool = False) -> int:
+    """
+    Insert queued sessions into the database and remove them from the queue.
+
+    Drains are serialized by the database write lock. Under ``BEGIN IMMEDIATE``
+    the queue is renamed to a batch file carrying a fresh token, so records
+    appended meanwhile land in a new queue. The batch's token is recorded in
+    ``project_state`` in the same transaction as its rows, so a batch file
+    that outlives its commit (a crash before the unlink) is discarded rather
+    than inserted twice. Batches left by a drain that never committed are
+    retried whenever a drain runs; with *recover* they are also looked for when
+    the queue itself is empty. Records that are not valid sessions are appended
+    to the ``.rejected`` file next to the queue instead of failing the drain.
+
+    Returns
+    -------
+    int
+        The number of sessions inserted.
+    """
+    queue_path = Path(queue_path)
+    # Listing the directory for leftover batches is left to drains that run.
+    if not queue_path.exists() and not (recover and _session_batches(queue_path)):
+        return 0
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        inserted, batches = _drain_session_batches(conn, queue_path)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    for batch in batches:
+        batch.unlink(missing_ok=True)
+    return inserted
+
+
+# project_state keys recording batch tokens whose rows are committed.
+_DRAINED_BATCH_PREFIX = "session_queue_batch:"
+_BATCH_SUFFIX = ".draining"
+
+
+def _session_batches(queue_path: Path) -> dict[str, Path]:
+    """Return the batch files claimed from *queue_path*, keyed by token."""
+    prefix = queue_path.name
+    batches: dict[str, Path] = {}
+    try:
+        entries = list(os.scandir(queue_path.parent))
+    except FileNotFoundError:
+        return batches
+    for entry in entries:
+        name = entry.name
+        if name.startswith(prefix) and name.endswith(_BATCH_SUFFIX):
+            # "<queue>.<token>.draining"; a bare "<queue>.draining" predates tokens.
+            token = name[len(prefix) : -len(_BATCH_SUFFIX)].lstrip(".")
+            batches[token] = queue_path.with_name(name)
+    return dict(sorted(batches.items()))
+
+
+def _drain_session_batches(conn: sqlite3.Connection, queue_path: Path) -> tuple[int, list[Path]]:
+    # Runs inside the drain transaction, so no other process is draining.
+    drained = {
+        row[0][len(_DRAINED_BATCH_PREFIX) :]
+        for row in conn.execute("SELECT key FROM project_state WHERE key GLOB ?", (_DRAINED_BATCH_PREFIX + "*",))
+    }
+    batches = _session_batches(queue_path)
+    for token in drained.intersection(batches):
+        # Committed by a drain that stopped before removing the file.
+        batches.pop(token).unlink(missing_ok=True)
+    # Every committed batch file is gone now, so its marker is no longer needed.
+    conn.execute("DELETE FROM project_state WHERE key GLOB ?", (_DRAINED_BATCH_PREFIX + "*",))
+
+    token = uuid.uuid4().hex
+    claimed = queue_path.with_name(f"{queue_path.name}.{token}{_BATCH_SUFFIX}")
+    try:
+        os.replace(queue_path, claimed)
+    except FileNotFoundError:
+        pass
+    else:
+        batches[token] = claimed
+
+    inserted = 0
+    for token, batch in batches.items():
+        try:
+            records = _read_session_batch(batch, queue_path)
+        except FileNotFoundError:
+            continue
+        inserted += _insert_session_rows(conn, records)
+        conn.execute(
+            "INSERT OR REPLACE INTO project_state (key, value) VALUES (?, ?)",
+            (_DRAINED_BATCH_PREFIX + token, batch.name),
+        )
+    return inserted, list(batches.values())
+
+
+def _read_session_batch(path: Path, queue_path: Path) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    rejected: list[str] = []
+    with path.open("r", encoding="utf-8") as handle:
+        for index, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(_normalize_session_record(index, json.loads(line)))
+            except ValueError:
+                # Torn lines (a writer killed mid-append) and invalid records are
+                # set aside so one bad entry cannot block the rest of the queue.
+                rejected.append(line if line.endswith("\n") else line + "\n")
+    if rejected:
+        rejected_path = queue_path.with_name(queue_path.name + ".rejected")
+        with rejected_path.open("a", encoding="utf-8") as handle:
+            handle.writelines(rejected)
+    return records
+
+
+def list_sessions(
+    conn: sqlite3.Connection,
+    *,
+    mission_id: str | None = None,
+    limit: int | None = None,
+) -> list[Session]:
+    params: list[Any] = []
     query = """
         SELECT id, ts, mission_id, action, agent, summary, details
         FROM sessions
@@ -537,10 +789,52 @@ def list_sessions(conn: sqlite3.Connection, *, mission_id: str | None = None) ->
     if mission_id:
         query += " WHERE mission_id = ?"
         params.append(mission_id)
-    query += " ORDER BY datetime(ts) DESC, id DESC"
+    query += " ORDER BY ts_sort DESC, id DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
 
     rows = conn.execute(query, params).fetchall()
-    return [Session(**dict(row)) for row in rows]
+    return [Session(*row) for row in rows]
+
+
+def count_sessions(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0])
+
+
+def list_recent_sessions(conn: sqlite3.Connection, limit: int | None = None) -> list[Session]:
+    """
+    Return sessions newest first by ``(datetime(ts), id)``, optionally capped at *limit*.
+    """
+    query = """
+        SELECT id, ts, mission_id, action, agent, summary, details
+        FROM sessions
+        ORDER BY ts_sort DESC, id DESC
+    """
+    params: tuple[int, ...] = ()
+    if limit:
+        query += " LIMIT ?"
+        params = (limit,)
+    return [Session(*row) for row in conn.execute(query, params)]
+
+
+def iter_sessions_chronological(conn: sqlite3.Connection, *, after_id: int | None = None) -> Iterator[Session]:
+    """
+    Yield sessions oldest first by ``(datetime(ts), id)`` without materializing them.
+
+    When *after_id* is given, only sessions inserted after that row are yielded.
+    """
+    query = """
+        SELECT id, ts, mission_id, action, agent, summary, details
+        FROM sessions
+    """
+    params: tuple[int, ...] = ()
+    if after_id is not None:
+        query += " WHERE id > ?"
+        params = (after_id,)
+    query += " ORDER BY ts_sort ASC, id ASC"
+    for row in conn.execute(query, params):
+        yield Session(*row)
 
 
 def get_session(conn: sqlite3.Connection, session_id: int) -> Session | None:
@@ -552,7 +846,17 @@ def get_session(conn: sqlite3.Connection, session_id: int) -> Session | None:
         """,
         (session_id,),
     ).fetchone()
-    return Session(**dict(row)) if row else None
+    return Session(*row) if row else None
+
+
+def get_project_state(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM project_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_project_state(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute("INSERT OR REPLACE INTO project_state (key, value) VALUES (?, ?)", (key, value))
+    conn.commit()
 
 
 def replace_missions(
@@ -580,90 +884,115 @@ def replace_sessions(
     """
     Replace all session rows with the provided collection.
     """
-    normalized_rows: list[dict[str, Any]] = []
-    for index, session in enumerate(sessions, start=1):
-        if not isinstance(session, dict):
-            raise ValueError(f"Session entry #{index} is not a JSON object.")
-
-        ts_raw = session.get("ts")
-        if ts_raw is None:
-            raise ValueError(f"Session entry #{index} is missing 'ts'.")
-        ts_value = str(ts_raw).strip()
-        if not ts_value:
-            raise ValueError(f"Session entry #{index} has an empty 'ts' value.")
-
-        action_raw = session.get("action") or _status_to_action(session.get("status"))
-        if not action_raw:
-            raise ValueError(f"Session entry #{index} is missing 'action'.")
-        action_value = _normalize_session_action(str(action_raw))
-
-        mission_raw = session.get("mission_id") or session.get("mission")
-        if mission_raw is None:
-            mission_value = None
-        elif isinstance(mission_raw, str):
-            mission_value = mission_raw.strip() or None
-        else:
-            mission_value = str(mission_raw).strip() or None
+    conn.execute("DELETE FROM sessions")
+    _insert_session_rows(conn, sessions)
+    conn.commit()
 
-        agent_raw = session.get("agent")
-        if agent_raw is None:
-            agent_value = None
-        elif isinstance(agent_raw, str):
-            agent_value = agent_raw.strip() or None
-        else:
-            agent_value = str(agent_raw).strip() or None
 
-        summary_raw = session.get("summary")
-        if summary_raw is None:
-            summary_value = None
-        elif isinstance(summary_raw, str):
-            summary_value = summary_raw.strip() or None
-        else:
-            summary_value = str(summary_raw).strip() or None
-
-        details_raw = session.get("details")
-        extras = {
-            key: value
-            for key, value in session.items()
-            if key
-            not in {"ts", "mission", "mission_id", "action", "status", "agent", "summary", "details"}
-        }
-
-        if details_raw is None and extras:
-            details_candidate: Any = extras
-        elif details_raw is not None and extras:
-            if isinstance(details_raw, dict):
-                details_candidate = {**details_raw, **extras}
-            else:
-                details_candidate = {"details": details_raw, **extras}
-        else:
-            details_candidate = details_raw
+def append_sessions(
+    conn: sqlite3.Connection,
+    sessions: Sequence[dict[str, Any]],
+) -> int:
+    """
+    Insert the provided session records in a single transaction.
+    """
+    inserted = _insert_session_rows(conn, sessions)
+    conn.commit()
+    return inserted
 
-        if isinstance(details_candidate, (dict, list)):
-            details_value = json.dumps(details_candidate, ensure_ascii=False)
-        elif details_candidate is None:
-            details_value = None
-        else:
-            details_value = str(details_candidate).strip() or None
-
-        normalized_rows.append(
-            {
-                "ts": ts_value,
-                "mission_id": mission_value,
-                "action": action_value,
-                "agent": agent_value,
-                "summary": summary_value,
-                "details": details_value,
-            }
-        )
 
-    conn.execute("DELETE FROM sessions")
-    if normalized_rows:
-        conn.executemany(
+def _insert_session_rows(conn: sqlite3.Connection, sessions: Sequence[dict[str, Any]]) -> int:
+    # Records are normalized as executemany consumes them, so no second list of
+    # rows is held. A record that fails validation aborts the whole transaction.
+    try:
+        cursor = conn.executemany(
             """
-            INSERT INTO sessions (ts, mission_id, action, agent, summary, details)
-            VALUES (:ts, :mission_id, :action, :agent, :summary, :details)
+            INSERT INTO sessions (ts, ts_sort, mission_id, action, agent, summary, details)
+            VALUES (:ts, datetime(:ts), :mission_id, :action, :agent, :summary, :details)
             """,
-            normalized_rows,
+            _iter_normalized_sessions(sessions),
         )
-    conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return max(cursor.rowcount, 0)
+
+
+# Record keys with a dedicated column; anything else is folded into details.
+_SESSION_RECORD_KEYS = frozenset({"ts", "mission", "mission_id", "action", "status", "agent", "summary", "details"})
+
+
+def _iter_normalized_sessions(sessions: Sequence[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    for index, session in enumerate(sessions, start=1):
+        yield _normalize_session_record(index, session)
+
+
+def _normalize_session_record(index: int, session: Any) -> dict[str, Any]:
+    """Return the sessions-table row for *session*, raising ValueError if it is invalid."""
+    if not isinstance(session, dict):
+        raise ValueError(f"Session entry #{index} is not a JSON object.")
+
+    ts_raw = session.get("ts")
+    if ts_raw is None:
+        raise ValueError(f"Session entry #{index} is missing 'ts'.")
+    ts_value = str(ts_raw).strip()
+    if not ts_value:
+        raise ValueError(f"Session entry #{index} has an empty 'ts' value.")
+
+    action_raw = session.get("action") or _status_to_action(session.get("status"))
+    if not action_raw:
+        raise ValueError(f"Session entry #{index} is missing 'action'.")
+    action_value = _normalize_session_action(str(action_raw))
+
+    mission_raw = session.get("mission_id") or session.get("mission")
+    if mission_raw is None:
+        mission_value = None
+    elif isinstance(mission_raw, str):
+        mission_value = mission_raw.strip() or None
+    else:
+        mission_value = str(mission_raw).strip() or None
+
+    agent_raw = session.get("agent")
+    if agent_raw is None:
+        agent_value = None
+    elif isinstance(agent_raw, str):
+        agent_value = agent_raw.strip() or None
+    else:
+        agent_value = str(agent_raw).strip() or None
+
+    summary_raw = session.get("summary")
+    if summary_raw is None:
+        summary_value = None
+    elif isinstance(summary_raw, str):
+        summary_value = summary_raw.strip() or None
+    else:
+        summary_value = str(summary_raw).strip() or None
+
+    details_raw = session.get("details")
+    extras = {key: value for key, value in session.items() if key not in _SESSION_RECORD_KEYS}
+
+    if details_raw is None and extras:
+        details_candidate: Any = extras
+    elif details_raw is not None and extras:
+        if isinstance(details_raw, dict):
+            details_candidate = {**details_raw, **extras}
+        else:
+            details_candidate = {"details": details_raw, **extras}
+    else:
+        details_candidate = details_raw
+
+    if isinstance(details_candidate, (dict, list)):
+        details_value = json.dumps(details_candidate, ensure_ascii=False)
+    elif details_candidate is None:
+        details_value = None
+    else:
+        details_value = str(details_candidate).strip() or None
+
+    return {
+        "ts": ts_value,
+        "mission_id": mission_value,
+        "action": action_value,
+        "agent": agent_value,
+        "summary": summary_value,
+        "details": details_value,
+    }
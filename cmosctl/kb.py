@@ -4,13 +4,26 @@ from __future__ import annotations
 
 import hashlib
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import count, repeat
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import Mapping, Sequence
+
+from cmos_core import schema
 
 from . import db as db_commands
-from ._knowledge import Paragraph, extract_paragraphs, iter_source_files, normalize_root, relative_path, shorten
+from ._knowledge import (
+    ParagraphBatch,
+    extract_paragraphs,
+    fingerprint,
+    iter_source_files,
+    make_relativizer,
+    normalize_root,
+    shorten,
+)
 
 
 @dataclass(slots=True)
@@ -38,6 +51,15 @@ class SearchHit:
         return payload
 
 
+# Shared by every chunk insert so sqlite3 reuses a single prepared statement.
+_INSERT_CHUNK_SQL = """
+    INSERT INTO kb_chunks (source_id, order_index, section, line, text, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Maximum snippet length, in characters, returned for each search hit.
+_SNIPPET_LIMIT = 280
+
 DEFAULT_VALIDATION_QUERIES: Sequence[str] = (
     "FTS5 search",
     "trigger registry",
@@ -60,66 +82,82 @@ def index_knowledge(
         return stats
 
     sources = list(iter_source_files(root))
+    relativize = make_relativizer(root)
     seen_paths: set[str] = set()
     now = _utc_now_iso()
 
     with db_commands.connect(db_path) as conn:
-        db_commands.migration_manager.apply_all(conn)
+        db_commands.ensure_migrated(conn, db_path)
         existing_sources = {
-            row["path"]: {"id": row["id"], "fingerprint": row["fingerprint"]}
-            for row in conn.execute("SELECT id, path, fingerprint FROM kb_sources")
+            row["path"]: {
+                "id": row["id"],
+                "fingerprint": row["fingerprint"],
+                "mtime_ns": row["mtime_ns"],
+                "size": row["size"],
+            }
+            for row in conn.execute("SELECT id, path, fingerprint, mtime_ns, size FROM kb_sources")
         }
 
-        for path in sources:
-            rel_path = relative_path(path, root)
-            seen_paths.add(rel_path)
-            try:
-                text = path.read_text(encoding="utf-8")
-            except UnicodeDecodeError:
-                text = path.read_text(encoding="utf-8", errors="ignore")
-            fingerprint = _fingerprint(text)
-            title, paragraphs = extract_paragraphs(text)
-            if not title:
-                title = path.stem.replace("_", " ").replace("-", " ") or path.name
-
-            existing = existing_sources.get(rel_path)
-            if existing and not force and existing.get("fingerprint") == fingerprint:
-                stats["skipped"] += 1
-                continue
-
-            if existing:
+        # Forced and first-time runs rewrite most chunks, so tokenize them in a
+        # single FTS rebuild instead of through the per-row sync triggers.
+        bulk = force or not existing_sources
+        rel_paths = [relativize(path) for path in sources]
+        known_sources = [None if force else existing_sources.get(rel_path) for rel_path in rel_paths]
+        # Worker threads overlap file reads with parsing; this thread stays the only
+        # writer on the connection.
+        with schema.bulk_fts_load(conn) if bulk else nullcontext(conn), ThreadPoolExecutor() as pool:
+            loaded_sources = pool.map(_load_source, sources, known_sources)
+            for rel_path, loaded in zip(rel_paths, loaded_sources):
+                seen_paths.add(rel_path)
+                if loaded is None:
+                    stats["skipped"] += 1
+                    continue
+                mtime_ns, size, parsed = loaded
+
+                existing = existing_sources.get(rel_path)
+                if parsed is None:
+                    # Touched but unchanged: remember the new stat so the next run skips the read.
+                    conn.execute(
+                        "UPDATE kb_sources SET mtime_ns = ?, size = ? WHERE id = ?",
+                        (mtime_ns, size, existing["id"]),
+                    )
+                    stats["skipped"] += 1
+                    continue
+                source_fingerprint, title, paragraphs = parsed
+
+                if existing:
+                    source_id = existing["id"]
+                    chunk_count = _sync_chunks(conn, source_id, paragraphs)
+                    conn.execute(
+                        """
+                        UPDATE kb_sources
+                        SET title = ?, fingerprint = ?, mtime_ns = ?, size = ?, last_indexed_ts = ?
+                        WHERE id = ?
+                        """,
+                        (title, source_fingerprint, mtime_ns, size, now, source_id),
+                    )
+                else:
+                    cursor = conn.execute(
+                        """
+                        INSERT INTO kb_sources (path, title, fingerprint, mtime_ns, size, last_indexed_ts)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (rel_path, title, source_fingerprint, mtime_ns, size, now),
+                    )
+                    source_id = cursor.lastrowid
+                    existing_sources[rel_path] = {"id": source_id, "fingerprint": source_fingerprint}
+                    chunk_count = _insert_chunks(conn, source_id, paragraphs)
+
+                stats["indexed"] += 1
+                stats["chunks"] += chunk_count
+
+            for rel_path, existing in existing_sources.items():
+                if rel_path in seen_paths:
+                    continue
                 source_id = existing["id"]
                 _remove_source_chunks(conn, source_id)
-                conn.execute(
-                    """
-                    UPDATE kb_sources
-                    SET title = ?, fingerprint = ?, last_indexed_ts = ?
-                    WHERE id = ?
-                    """,
-                    (title, fingerprint, now, source_id),
-                )
-            else:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO kb_sources (path, title, fingerprint, last_indexed_ts)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (rel_path, title, fingerprint, now),
-                )
-                source_id = cursor.lastrowid
-                existing_sources[rel_path] = {"id": source_id, "fingerprint": fingerprint}
-
-            chunk_count = _insert_chunks(conn, source_id, paragraphs)
-            stats["indexed"] += 1
-            stats["chunks"] += chunk_count
-
-        for rel_path, existing in existing_sources.items():
-            if rel_path in seen_paths:
-                continue
-            source_id = existing["id"]
-            _remove_source_chunks(conn, source_id)
-            conn.execute("DELETE FROM kb_sources WHERE id = ?", (source_id,))
-            stats["deleted"] += 1
+                conn.execute("DELETE FROM kb_sources WHERE id = ?", (source_id,))
+                stats["deleted"] += 1
 
         conn.commit()
 
@@ -134,56 +172,10 @@ def search_knowledge(
 ) -> list[SearchHit]:
     """Execute an FTS5 search over indexed knowledge chunks."""
 
-    normalized_query = " ".join(query.split()).strip()
-    if not normalized_query:
-        raise ValueError("Query must include at least one term.")
-
-    limit_clause = max(limit, 0)
-
+    normalized_query = _normalize_query(query)
     with db_commands.connect(db_path) as conn:
-        db_commands.migration_manager.apply_all(conn)
-        conn.execute("PRAGMA case_sensitive_like = OFF;")
-        sql = (
-            """
-            SELECT
-                c.id AS chunk_id,
-                s.path AS path,
-                s.title AS title,
-                c.section AS section,
-                c.line AS line,
-                c.text AS text,
-                c.order_index AS order_index,
-                bm25(kb_chunks_fts) AS rank
-            FROM kb_chunks_fts
-            JOIN kb_chunks c ON kb_chunks_fts.rowid = c.id
-            JOIN kb_sources s ON c.source_id = s.id
-            WHERE kb_chunks_fts MATCH ?
-            ORDER BY rank ASC, s.path ASC, c.order_index ASC
-            """
-        )
-        params: list[object] = [normalized_query]
-        if limit_clause > 0:
-            sql += " LIMIT ?"
-            params.append(limit_clause)
-
-        rows = conn.execute(sql, params).fetchall()
-
-    results: list[SearchHit] = []
-    for row in rows:
-        score_raw = row["rank"] if row["rank"] is not None else 0.0
-        score = 1.0 / (1.0 + max(score_raw, 0.0))
-        snippet = shorten(row["text"])
-        results.append(
-            SearchHit(
-                path=row["path"],
-                title=row["title"] or row["path"],
-                section=row["section"],
-                line=row["line"],
-                snippet=snippet,
-                score=score,
-            )
-        )
-    return results
+        _prepare_search(conn, db_path)
+        return _search_chunks(conn, normalized_query, limit)
 
 
 def validate_queries(
@@ -201,40 +193,157 @@ def validate_queries(
 
     sample_queries = list(queries) if queries else list(DEFAULT_VALIDATION_QUERIES)
     report: list[dict[str, object]] = []
-    for query in sample_queries:
-        hits = search_knowledge(query, db_path=db_path, limit=limit)
-        report.append({"query": query, "hit_count": len(hits), "hits": [hit.as_dict() for hit in hits]})
+    # One connection serves every query, so the page cache stays warm between
+    # searches.
+    with db_commands.connect(db_path) as conn:
+        _prepare_search(conn, db_path)
+        for query in sample_queries:
+            hits = _search_chunks(conn, _normalize_query(query), limit)
+            report.append({"query": query, "hit_count": len(hits), "hits": [hit.as_dict() for hit in hits]})
     return report
 
 
-def _fingerprint(text: str) -> str:
-    return hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+def _normalize_query(query: str) -> str:
+    normalized_query = " ".join(query.split()).strip()
+    if not normalized_query:
+        raise ValueError("Query must include at least one term.")
+    return normalized_query
+
+
+def _prepare_search(conn: sqlite3.Connection, db_path: Path | str) -> None:
+    db_commands.ensure_migrated(conn, db_path)
+    conn.execute("PRAGMA case_sensitive_like = OFF;")
 
 
-def _insert_chunks(conn: sqlite3.Connection, source_id: int, paragraphs: Iterable[Paragraph]) -> int:
-    count = 0
-    for index, block in enumerate(paragraphs):
-        text = block.text.strip()
-        if not text:
-            continue
-        cursor = conn.execute(
-            """
-            INSERT INTO kb_chunks (source_id, order_index, section, line, text)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (source_id, index, block.section, block.line, text),
+def _search_chunks(conn: sqlite3.Connection, normalized_query: str, limit: int) -> list[SearchHit]:
+    limit_clause = max(limit, 0)
+    # Only one character past the snippet limit is needed for shorten() to see that
+    # a paragraph is too long, so SQLite trims the text before it crosses into Python.
+    sql = (
+        """
+        SELECT
+            s.path AS path,
+            s.title AS title,
+            c.section AS section,
+            c.line AS line,
+            substr(c.text, 1, ?) AS text,
+            bm25(kb_chunks_fts) AS rank,
+            1.0 / (1.0 + max(coalesce(bm25(kb_chunks_fts), 0.0), 0.0)) AS score
+        FROM kb_chunks_fts
+        JOIN kb_chunks c ON kb_chunks_fts.rowid = c.id
+        JOIN kb_sources s ON c.source_id = s.id
+        WHERE kb_chunks_fts MATCH ?
+        ORDER BY rank ASC, s.path ASC, c.order_index ASC
+        """
+    )
+    params: list[object] = [_SNIPPET_LIMIT + 1, normalized_query]
+    if limit_clause > 0:
+        sql += " LIMIT ?"
+        params.append(limit_clause)
+
+    # The score is computed by SQLite alongside the rank, leaving Python only the
+    # snippet trim and object construction per hit.
+    return [
+        SearchHit(
+            path=row["path"],
+            title=row["title"] or row["path"],
+            section=row["section"],
+            line=row["line"],
+            snippet=shorten(row["text"], limit=_SNIPPET_LIMIT),
+            score=row["score"],
         )
-        chunk_id = cursor.lastrowid
-        conn.execute("INSERT INTO kb_chunks_fts(rowid, text) VALUES (?, ?)", (chunk_id, text))
-        count += 1
-    return count
+        for row in conn.execute(sql, params)
+    ]
+
+
+def _load_source(
+    path: Path, known: Mapping[str, object] | None
+) -> tuple[int, int, tuple[str, str, ParagraphBatch] | None] | None:
+    """Read and parse *path* unless it still matches the *known* ``kb_sources`` row.
+
+    Returns ``None`` when the file's mtime and size match *known*, so it is never
+    read. Otherwise returns ``(mtime_ns, size, parsed)`` where *parsed* is
+    ``None`` when the content fingerprint still matches.
+    """
+
+    stat = path.stat()
+    if known is not None and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+        return None
+    # The raw bytes are hashed before decoding, so unchanged content is never decoded.
+    data = path.read_bytes()
+    source_fingerprint = _fingerprint(data)
+    if known is not None and source_fingerprint == known["fingerprint"]:
+        return stat.st_mtime_ns, stat.st_size, None
+    # extract_paragraphs normalizes line endings itself, so no text-mode translation is needed.
+    text = data.decode("utf-8", errors="ignore")
+    title, paragraphs = extract_paragraphs(text)
+    if not title:
+        title = path.stem.replace("_", " ").replace("-", " ") or path.name
+    return stat.st_mtime_ns, stat.st_size, (source_fingerprint, title, paragraphs)
+
+
+def _fingerprint(data: bytes) -> str:
+    # A change detector only. On whole files OpenSSL's SHA-1 outruns the other
+    # hashlib digests (blake2b runs at about half its throughput); at paragraph
+    # size call overhead dominates and the two cost the same.
+    return hashlib.sha1(data).hexdigest()
+
+
+def _insert_chunks(conn: sqlite3.Connection, source_id: int, paragraphs: ParagraphBatch) -> int:
+    conn.executemany(
+        _INSERT_CHUNK_SQL,
+        zip(
+            repeat(source_id),
+            count(),
+            paragraphs.sections,
+            paragraphs.lines,
+            paragraphs.texts,
+            map(fingerprint, paragraphs.texts),
+        ),
+    )
+    return len(paragraphs)
 
 
-def _remove_source_chunks(conn: sqlite3.Connection, source_id: int) -> None:
-    conn.execute(
-        "DELETE FROM kb_chunks_fts WHERE rowid IN (SELECT id FROM kb_chunks WHERE source_id = ?)",
+def _sync_chunks(conn: sqlite3.Connection, source_id: int, paragraphs: ParagraphBatch) -> int:
+    """Reconcile stored chunks with *paragraphs*, keeping rows whose text is unchanged.
+
+    Matching paragraphs only have their position metadata updated, which does not
+    touch the FTS index; changed text is deleted and reinserted.
+    """
+
+    reusable: dict[bytes, list[int]] = {}
+    stale: list[int] = []
+    for chunk_id, digest in conn.execute(
+        "SELECT id, fingerprint FROM kb_chunks WHERE source_id = ? ORDER BY order_index DESC",
         (source_id,),
+    ):
+        if digest is None:
+            stale.append(chunk_id)
+        else:
+            reusable.setdefault(digest, []).append(chunk_id)
+
+    moved: list[tuple[int, str | None, int, int]] = []
+    added: list[tuple[int, int, str | None, int, str, bytes]] = []
+    for index, (text, line, section) in enumerate(zip(paragraphs.texts, paragraphs.lines, paragraphs.sections)):
+        digest = fingerprint(text)
+        candidates = reusable.get(digest)
+        if candidates:
+            moved.append((index, section, line, candidates.pop()))
+        else:
+            added.append((source_id, index, section, line, text, digest))
+
+    stale.extend(chunk_id for chunk_ids in reusable.values() for chunk_id in chunk_ids)
+    conn.executemany("DELETE FROM kb_chunks WHERE id = ?", ((chunk_id,) for chunk_id in stale))
+    conn.executemany(
+        "UPDATE kb_chunks SET order_index = ?, section = ?, line = ? WHERE id = ?",
+        moved,
     )
+    conn.executemany(_INSERT_CHUNK_SQL, added)
+    return len(paragraphs)
+
+
+def _remove_source_chunks(conn: sqlite3.Connection, source_id: int) -> None:
+    # The kb_chunks_ad trigger (or a bulk rebuild) removes the matching FTS rows.
     conn.execute("DELETE FROM kb_chunks WHERE source_id = ?", (source_id,))
 
 
@@ -7,12 +7,18 @@ manually scanning the repository.
 
 from __future__ import annotations
 
+import heapq
+import math
+import re
+import sys
+from collections import Counter
 from dataclasses import dataclass
-from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, Mapping
+from typing import Mapping, Sequence
 
-from ._knowledge import extract_paragraphs, iter_source_files, normalize_root, relative_path, shorten
+from ._knowledge import extract_paragraphs, iter_source_files, make_relativizer, normalize_root, shorten
 
 
 @dataclass(slots=True)
@@ -47,14 +53,42 @@ class _IndexedSnippet:
     section: str | None
     line: int
     text: str
+    # Lowercased text and its character frequencies, computed once at index time.
+    text_lower: str
+    char_counts: Counter[str]
 
     @property
     def excerpt(self) -> str:
         return shorten(self.text)
 
 
-_INDEX_CACHE: dict[Path, tuple[_IndexedSnippet, ...]] = {}
+@dataclass(frozen=True, slots=True)
+class _PreparedQuery:
+    """Per-query values shared by every snippet score; cached across calls."""
+
+    text: str
+    tokens: tuple[str, ...]
+    char_counts: tuple[tuple[str, int], ...]
+
+
+@dataclass(slots=True)
+class _SnippetIndex:
+    """Snippets under one root plus their lowercased texts as a parallel column.
+
+    Scoring scans the column with C-level calls and reaches into snippet objects
+    only for the entries it scores.
+    """
+
+    snippets: tuple[_IndexedSnippet, ...]
+    texts: tuple[str, ...]
+
+
+# Runs of two or more alphanumeric characters; [^\W_] is exactly str.isalnum().
+_TOKEN_RE = re.compile(r"[^\W_]{2,}")
+
+_INDEX_CACHE: dict[Path, _SnippetIndex] = {}
 _INDEX_SIGNATURES: dict[Path, dict[Path, float]] = {}
+_INDEX_FILES: dict[Path, dict[Path, tuple[_IndexedSnippet, ...]]] = {}
 
 
 def recall_knowledge(
@@ -76,30 +110,38 @@ def recall_knowledge(
         is embedded in alternative environments (such as tests).
     """
 
-    normalized_query = " ".join(query.split()).strip()
-    if not normalized_query:
-        raise ValueError("Query must include at least one term.")
-
-    query_tokens = _tokenize(normalized_query)
-    if not query_tokens:
-        raise ValueError("Query must include at least one alphanumeric term.")
+    prepared = _prepare_query(query)
+    query_lower = prepared.text
+    query_counts = prepared.char_counts
 
     root = normalize_root(kb_root)
-    snippets = _load_index(root)
-    query_lower = normalized_query.lower()
+    index = _load_index(root)
+
+    # One column of occurrence counts per token, scanned with C-level str.count.
+    columns = [list(map(str.count, index.texts, repeat(token))) for token in prepared.tokens]
+    token_weights = _token_weights(columns, len(index.texts))
 
     scored: list[tuple[float, _IndexedSnippet]] = []
-    for snippet in snippets:
-        score = _score_snippet(snippet, query_tokens, query_lower)
+    for snippet, counts in zip(index.snippets, zip(*columns)):
+        if any(counts):
+            score = _hit_score(snippet.text_lower, counts, token_weights, query_lower)
+        else:
+            # Every token is a substring of the query, so without a token hit the
+            # query cannot occur either and only the fuzzy fallback can match.
+            score = _fuzzy_score(snippet, query_lower, query_counts)
         if score > 0:
             scored.append((score, snippet))
 
     if not scored:
         return []
 
-    scored.sort(key=lambda item: (-item[0], item[1].rel_path, item[1].line))
+    if limit > 0:
+        # A heap keeps only the best *limit* entries; nsmallest orders them as sorted() would.
+        scored = heapq.nsmallest(limit, scored, key=_rank_key)
+    else:
+        scored.sort(key=_rank_key)
     results: list[RecallResult] = []
-    for score, snippet in scored[: limit if limit > 0 else len(scored)]:
+    for score, snippet in scored:
         excerpt = snippet.excerpt
         if snippet.section and snippet.section not in excerpt:
             excerpt = f"{snippet.section}: {excerpt}"
@@ -122,62 +164,69 @@ def rebuild_index(kb_root: Path | None = None) -> int:
     """
 
     root = normalize_root(kb_root)
-    snippets = _build_index(root)
-    _INDEX_CACHE[root] = snippets
-    _INDEX_SIGNATURES[root] = _build_signature(snippets)
-    return len(snippets)
+    _INDEX_CACHE.pop(root, None)
+    _INDEX_SIGNATURES.pop(root, None)
+    _INDEX_FILES.pop(root, None)
+    return len(_load_index(root).snippets)
 
 
-def _load_index(root: Path) -> tuple[_IndexedSnippet, ...]:
+def _load_index(root: Path) -> _SnippetIndex:
+    current_signature = _collect_signature(root)
     cached = _INDEX_CACHE.get(root)
     signature = _INDEX_SIGNATURES.get(root)
-    if cached is not None and signature is not None:
-        current_signature = _collect_signature(root)
-        if current_signature == signature:
-            return cached
-
-    snippets = _build_index(root)
-    _INDEX_CACHE[root] = snippets
-    _INDEX_SIGNATURES[root] = _build_signature(snippets)
-    return snippets
-
-
-def _build_index(root: Path) -> tuple[_IndexedSnippet, ...]:
-    sources = list(iter_source_files(root))
+    if cached is not None and current_signature == signature:
+        return cached
+
+    # Only files whose mtime changed are parsed again; the rest keep their snippets.
+    previous_files = _INDEX_FILES.get(root, {})
+    previous_signature = signature or {}
+    relativize = make_relativizer(root)
+    files: dict[Path, tuple[_IndexedSnippet, ...]] = {}
+    for path, mtime in current_signature.items():
+        file_snippets = previous_files.get(path)
+        if file_snippets is None or previous_signature.get(path) != mtime:
+            file_snippets = _index_file(path, relativize(path))
+        files[path] = file_snippets
+
+    snippets = tuple(snippet for file_snippets in files.values() for snippet in file_snippets)
+    index = _SnippetIndex(snippets=snippets, texts=tuple(snippet.text_lower for snippet in snippets))
+    _INDEX_CACHE[root] = index
+    _INDEX_SIGNATURES[root] = current_signature
+    _INDEX_FILES[root] = files
+    return index
+
+
+def _index_file(path: Path, rel_path: str) -> tuple[_IndexedSnippet, ...]:
+    # One read; extract_paragraphs normalizes line endings, and decoding with
+    # errors="ignore" matches the old strict-then-lenient retry without re-reading.
+    text = path.read_bytes().decode("utf-8", errors="ignore")
+    title, paragraphs = extract_paragraphs(text)
+    if not title:
+        title = path.stem.replace("_", " ").replace("-", " ") or path.name
+    # Snippets of one file already share these objects; interning also shares
+    # them across files (common headings such as "Overview") in the long-lived cache.
+    title = sys.intern(title)
+    rel_path = sys.intern(rel_path)
     snippets: list[_IndexedSnippet] = []
-    for path in sources:
-        try:
-            text = path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            text = path.read_text(encoding="utf-8", errors="ignore")
-        title, paragraphs = extract_paragraphs(text)
-        if not title:
-            title = path.stem.replace("_", " ").replace("-", " ") or path.name
-        rel_path = relative_path(path, root)
-        for block in paragraphs:
-            snippets.append(
-                _IndexedSnippet(
-                    path=path,
-                    rel_path=rel_path,
-                    title=title,
-                    section=block.section,
-                    line=block.line,
-                    text=block.text,
-                )
+    for text_value, line, section in zip(paragraphs.texts, paragraphs.lines, paragraphs.sections):
+        if section is not None:
+            section = sys.intern(section)
+        text_lower = text_value.lower()
+        snippets.append(
+            _IndexedSnippet(
+                path=path,
+                rel_path=rel_path,
+                title=title,
+                section=section,
+                line=line,
+                text=text_value,
+                text_lower=text_lower,
+                char_counts=Counter(text_lower),
             )
+        )
     return tuple(snippets)
 
 
-def _build_signature(snippets: Iterable[_IndexedSnippet]) -> dict[Path, float]:
-    signature: dict[Path, float] = {}
-    for snippet in snippets:
-        try:
-            signature[snippet.path] = snippet.path.stat().st_mtime
-        except FileNotFoundError:
-            signature[snippet.path] = 0.0
-    return signature
-
-
 def _collect_signature(root: Path) -> dict[Path, float]:
     signature: dict[Path, float] = {}
     for path in iter_source_files(root):
@@ -188,41 +237,78 @@ def _collect_signature(root: Path) -> dict[Path, float]:
     return signature
 
 
+@lru_cache(maxsize=512)
+def _prepare_query(query: str) -> _PreparedQuery:
+    normalized_query = " ".join(query.split()).strip()
+    if not normalized_query:
+        raise ValueError("Query must include at least one term.")
+
+    query_tokens = _tokenize(normalized_query)
+    if not query_tokens:
+        raise ValueError("Query must include at least one alphanumeric term.")
+
+    query_lower = normalized_query.lower()
+    return _PreparedQuery(
+        text=query_lower,
+        tokens=tuple(dict.fromkeys(query_tokens)),
+        char_counts=tuple(Counter(query_lower).items()),
+    )
+
+
+def _rank_key(item: tuple[float, _IndexedSnippet]) -> tuple[float, str, int]:
+    score, snippet = item
+    return -score, snippet.rel_path, snippet.line
+
+
 def _tokenize(text: str) -> list[str]:
-    tokens: list[str] = []
-    word = []
-    for char in text.lower():
-        if char.isalnum():
-            word.append(char)
-        else:
-            if word:
-                token = "".join(word)
-                if len(token) > 1:
-                    tokens.append(token)
-                word = []
-    if word:
-        token = "".join(word)
-        if len(token) > 1:
-            tokens.append(token)
-    return tokens
-
-
-def _score_snippet(snippet: _IndexedSnippet, tokens: list[str], query_lower: str) -> float:
-    text_lower = snippet.text.lower()
-    values: dict[str, int] = {}
-    for token in tokens:
-        values[token] = text_lower.count(token)
-    direct_hits = sum(values.values())
-    if direct_hits == 0 and query_lower not in text_lower:
-        matcher = SequenceMatcher(None, query_lower, text_lower)
-        ratio = matcher.quick_ratio()
-        return ratio if ratio > 0.6 else 0.0
-
-    score = float(direct_hits)
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _token_weights(columns: Sequence[list[int]], total: int) -> list[float]:
+    """Return the BM25 inverse document frequency of each query token.
+
+    *columns* holds each token's occurrence count in every snippet, so a token's
+    document frequency is the number of non-zero entries in its column.
+    """
+
+    weights: list[float] = []
+    for column in columns:
+        frequency = total - column.count(0)
+        weights.append(math.log((total - frequency + 0.5) / (frequency + 0.5) + 1.0))
+    return weights
+
+
+def _hit_score(
+    text_lower: str,
+    counts: tuple[int, ...],
+    weights: Sequence[float],
+    query_lower: str,
+) -> float:
+    # Rare tokens outweigh common ones: each occurrence counts for its token's IDF.
+    score = sum(weight * hits for weight, hits in zip(weights, counts))
     if query_lower in text_lower:
         score += 1.0
 
-    unique_hits = sum(1 for token in set(tokens) if token in text_lower)
+    unique_hits = sum(1 for hits in counts if hits)
     score += 0.25 * unique_hits
 
     return score
+
+
+def _fuzzy_score(
+    snippet: _IndexedSnippet,
+    query_lower: str,
+    query_counts: Sequence[tuple[str, int]],
+) -> float:
+    # SequenceMatcher.quick_ratio() over precomputed character counts: the
+    # overlap of the two character multisets, scaled by their total length.
+    # At most every character of the shorter string matches, so snippets whose
+    # length keeps even that bound under the threshold are rejected first.
+    text_length = len(snippet.text_lower)
+    total = len(query_lower) + text_length
+    if 2.0 * min(len(query_lower), text_length) / total <= 0.6:
+        return 0.0
+    char_counts = snippet.char_counts
+    matches = sum(min(number, char_counts[char]) for char, number in query_counts)
+    ratio = 2.0 * matches / total
+    return ratio if ratio > 0.6 else 0.0
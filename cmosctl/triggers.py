@@ -3,13 +3,22 @@ from __future__ import annotations
 import getpass
 import json
 import os
+import sqlite3
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List
 
-import yaml
-
 from . import db as db_commands
+from ._backlog import derive_sprint_status
+from ._io import (
+    json_loads,
+    load_yaml_documents,
+    parse_details_field,
+    read_json_snapshot,
+    replace_file_text,
+    write_yaml_documents,
+)
 from .kb import SearchHit, search_knowledge as kb_search
 from .recall import RecallResult, recall_knowledge
 
@@ -26,6 +35,10 @@ SESSION_STATUS_FROM_ACTION = {
     "commit": "commit",
 }
 
+# Same output as json.dump(record, handle, ensure_ascii=False).
+_JSONL_ENCODE = json.JSONEncoder(ensure_ascii=False).encode
+_SESSIONS_BUFFER_SIZE = 1 << 20
+
 
 @dataclass(slots=True)
 class MissionContext:
@@ -57,7 +70,9 @@ class TriggerResult:
 TriggerHandler = Callable[..., TriggerResult]
 
 
+@lru_cache(maxsize=None)
 def _default_agent() -> str:
+    # Resolved once per process; tests that change CMOS_AGENT call cache_clear().
     env_agent = os.getenv("CMOS_AGENT")
     if env_agent and env_agent.strip():
         return env_agent.strip()
@@ -71,55 +86,11 @@ def _normalize_phrase(phrase: str) -> str:
     return " ".join(phrase.strip().lower().split())
 
 
-def _extract_header(text: str) -> str:
-    header_lines: list[str] = []
-    for line in text.splitlines():
-        if line.startswith("#"):
-            header_lines.append(line)
-        else:
-            break
-    return "\n".join(header_lines)
-
-
-def _derive_sprint_status(original_status: str | None, mission_statuses: Iterable[str | None]) -> str:
-    statuses = {status for status in mission_statuses if status}
-    if not statuses:
-        return original_status or "Queued"
-    if statuses == {"Completed"}:
-        return "Completed"
-    if "Blocked" in statuses:
-        return "Blocked"
-    if "In Progress" in statuses:
-        return "In Progress"
-    if "Current" in statuses:
-        return "Current"
-    if statuses == {"Queued"}:
-        if original_status and original_status.lower() == "planned":
-            return original_status
-        return "Queued"
-    if statuses == {"Completed", "Queued"}:
-        return "In Progress"
-    return original_status or "In Progress"
-
-
-def _parse_details_field(details: str | None) -> Any:
-    if details is None:
-        return None
-    text = details.strip()
-    if not text:
-        return None
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        return text
-
-
 def _load_backlog_documents(backlog_path: Path) -> tuple[str, list[Any]]:
-    if not backlog_path.exists():
-        raise FileNotFoundError(f"Backlog file not found at {backlog_path}")
-    raw_text = backlog_path.read_text(encoding="utf-8")
-    header = _extract_header(raw_text)
-    docs = list(yaml.safe_load_all(raw_text))
+    try:
+        header, docs = load_yaml_documents(backlog_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Backlog file not found at {backlog_path}") from None
     if not docs:
         docs.append({})
     if len(docs) < 2:
@@ -127,10 +98,9 @@ def _load_backlog_documents(backlog_path: Path) -> tuple[str, list[Any]]:
     return header, docs
 
 
-def _sync_backlog(db_path: Path, backlog_path: Path) -> None:
+def _sync_backlog(conn: sqlite3.Connection, backlog_path: Path) -> None:
     header, docs = _load_backlog_documents(backlog_path)
-    with db_commands.connect(db_path) as conn:
-        missions = db_commands.list_missions(conn)
+    missions = db_commands.list_missions(conn)
     mission_map: Dict[str, db_commands.Mission] = {mission.id: mission for mission in missions}
 
     second_doc = docs[1]
@@ -148,14 +118,16 @@ def _sync_backlog(db_path: Path, backlog_path: Path) -> None:
         sprints = []
         domain_fields["sprints"] = sprints
 
+    # Non-dict items are kept in place for the writeback but skipped everywhere else.
+    typed_sprints = [sprint for sprint in sprints if isinstance(sprint, dict)]
     sprint_map: Dict[str | None, dict[str, Any]] = {}
-    for sprint in sprints:
-        if isinstance(sprint, dict):
-            sprint_id = sprint.get("sprintId")
-            if sprint_id not in sprint_map:
-                sprint_map[sprint_id] = sprint
+    for sprint in typed_sprints:
+        sprint_map.setdefault(sprint.get("sprintId"), sprint)
+
+    # Per sprint, the first entry for each mission id, built when the sprint is first used.
+    entry_maps: Dict[str, dict[str, dict[str, Any]]] = {}
 
-    def ensure_sprint(mission: db_commands.Mission) -> dict[str, Any]:
+    def ensure_sprint(mission: db_commands.Mission) -> tuple[list[Any], dict[str, dict[str, Any]]]:
         sprint_id = mission.sprint_id or "Unassigned"
         sprint = sprint_map.get(sprint_id)
         if sprint is None:
@@ -167,97 +139,169 @@ def _sync_backlog(db_path: Path, backlog_path: Path) -> None:
                 "missions": [],
             }
             sprints.append(sprint)
+            typed_sprints.append(sprint)
             sprint_map[sprint_id] = sprint
         missions_list = sprint.setdefault("missions", [])
         if not isinstance(missions_list, list):
             missions_list = []
             sprint["missions"] = missions_list
-        return sprint
+        entries = entry_maps.get(sprint_id)
+        if entries is None:
+            entries = {}
+            for item in missions_list:
+                # Mission ids are strings, so entries with any other id never match.
+                if isinstance(item, dict) and isinstance(item.get("id"), str):
+                    entries.setdefault(item["id"], item)
+            entry_maps[sprint_id] = entries
+        return missions_list, entries
 
     for mission in missions:
-        sprint = ensure_sprint(mission)
-        missions_list = sprint["missions"]
-        entry = None
-        for item in missions_list:
-            if isinstance(item, dict) and item.get("id") == mission.id:
-                entry = item
-                break
+        mission_id = mission.id
+        completed_at = mission.completed_at
+        notes = mission.notes
+        missions_list, entries = ensure_sprint(mission)
+        entry = entries.get(mission_id)
         if entry is None:
-            entry = {"id": mission.id, "name": mission.name}
+            entry = {"id": mission_id, "name": mission.name}
             missions_list.append(entry)
-        entry["name"] = mission.name
-        entry["status"] = mission.status
-        if mission.completed_at:
-            entry["completed_at"] = mission.completed_at
-        else:
-            entry.pop("completed_at", None)
-        if mission.notes:
-            entry["notes"] = mission.notes
+            entries[mission_id] = entry
         else:
-            entry.pop("notes", None)
-
-    for sprint in sprints:
-        if not isinstance(sprint, dict):
-            continue
+            entry["name"] = mission.name
+        entry["status"] = mission.status
+        if completed_at:
+            entry["completed_at"] = completed_at
+        elif "completed_at" in entry:
+            del entry["completed_at"]
+        if notes:
+            entry["notes"] = notes
+        elif "notes" in entry:
+            del entry["notes"]
+
+    for sprint in typed_sprints:
         missions_list = sprint.get("missions") or []
-        statuses = [item.get("status") for item in missions_list if isinstance(item, dict)]
-        sprint["status"] = _derive_sprint_status(sprint.get("status"), statuses)
-
-    backlog_path.parent.mkdir(parents=True, exist_ok=True)
-    with backlog_path.open("w", encoding="utf-8") as handle:
-        if header:
-            handle.write(header.rstrip() + "\n")
-        yaml.safe_dump_all(docs, handle, sort_keys=False)
-
-
-def _sync_sessions(db_path: Path, sessions_path: Path) -> None:
-    with db_commands.connect(db_path) as conn:
-        sessions = db_commands.list_sessions(conn)
-
-    sessions_sorted = sorted(sessions, key=lambda entry: (entry.ts, entry.id))
-    sessions_path.parent.mkdir(parents=True, exist_ok=True)
-    with sessions_path.open("w", encoding="utf-8") as handle:
-        for session in sessions_sorted:
+        statuses = (item.get("status") for item in missions_list if isinstance(item, dict))
+        sprint["status"] = derive_sprint_status(sprint.get("status"), statuses)
+
+    # _load_backlog_documents has just read the file, so its directory exists.
+    write_yaml_documents(backlog_path, header, docs)
+
+
+def _sync_sessions(conn: sqlite3.Connection, sessions_path: Path) -> None:
+    state_key = f"sessions_sync:{os.path.abspath(sessions_path)}"
+    encode = _JSONL_ENCODE
+    status_for = SESSION_STATUS_FROM_ACTION.get
+    state = _sessions_sync_state(conn, state_key)
+    after_id = _sessions_append_point(conn, sessions_path, state)
+    if after_id is None:
+        count, max_id, tail_sort = 0, 0, ""
+        # Only a rewrite can be the first write; appending means the file was just stat'ed.
+        sessions_path.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        count, max_id, tail_sort = state["count"], state["max_id"], state["tail_sort"]
+    tail_id = None
+    # Rows stream from SQLite already ordered by (ts_sort, id), and the 1 MiB buffer
+    # turns the per-record writes into a few large write syscalls.
+    with sessions_path.open(
+        "w" if after_id is None else "a", encoding="utf-8", buffering=_SESSIONS_BUFFER_SIZE
+    ) as handle:
+        write = handle.write
+        for session in db_commands.iter_sessions_chronological(conn, after_id=after_id):
             record = {
                 "ts": session.ts,
                 "mission": session.mission_id,
                 "action": session.action,
-                "status": SESSION_STATUS_FROM_ACTION.get(session.action, session.action),
+                "status": status_for(session.action, session.action),
                 "agent": session.agent,
                 "summary": session.summary,
             }
-            details = _parse_details_field(session.details)
+            details = parse_details_field(session.details)
             if details is not None:
                 record["details"] = details
-            json.dump(record, handle, ensure_ascii=False)
-            handle.write("\n")
+            write(encode(record) + "\n")
+            count += 1
+            max_id = max(max_id, session.id)
+            tail_id = session.id
+    if tail_id is not None:
+        (tail_sort,) = conn.execute("SELECT ts_sort FROM sessions WHERE id = ?", (tail_id,)).fetchone()
+        tail_sort = tail_sort or ""
+    stat = sessions_path.stat()
+    state = {
+        "count": count,
+        "max_id": max_id,
+        "tail_sort": tail_sort,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    db_commands.set_project_state(conn, state_key, json.dumps(state))
+
+
+def _sessions_sync_state(conn: sqlite3.Connection, state_key: str) -> dict[str, Any] | None:
+    raw = db_commands.get_project_state(conn, state_key)
+    if raw is None:
+        return None
+    try:
+        state = json_loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _sessions_append_point(
+    conn: sqlite3.Connection, sessions_path: Path, state: dict[str, Any] | None
+) -> int | None:
+    """Return the session id after which *sessions_path* can be appended to.
+
+    ``None`` means the file must be rewritten: it changed since the last sync,
+    sessions it holds were deleted (e.g. by an import), or a newer session sorts
+    before its last line.
+    """
+
+    if state is None:
+        return None
+    try:
+        stat = sessions_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (state["size"], state["mtime_ns"]):
+            return None
+        max_id = state["max_id"]
+        (written,) = conn.execute("SELECT COUNT(*) FROM sessions WHERE id <= ?", (max_id,)).fetchone()
+        if written != state["count"]:
+            return None
+        out_of_order = conn.execute(
+            "SELECT 1 FROM sessions WHERE id > ? AND (ts_sort IS NULL OR ts_sort < ?) LIMIT 1",
+            (max_id, state["tail_sort"]),
+        ).fetchone()
+    except (OSError, KeyError, TypeError, sqlite3.Error):
+        return None
+    return None if out_of_order else max_id
 
 
 def _update_project_context(project_context_path: Path, *, mission_id: str, completion_ts: str) -> None:
     if not project_context_path.exists():
         raise FileNotFoundError(f"Project context file not found at {project_context_path}")
 
-    with project_context_path.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
+    data = json_loads(project_context_path.read_bytes())
 
     working = data.setdefault("working_memory", {})
     session_count = working.get("session_count", 0)
-    try:
-        count_int = int(session_count)
-    except (TypeError, ValueError):
-        count_int = 0
-    working["session_count"] = count_int + 1
-    working["last_session"] = completion_ts
-    working["last_mission"] = mission_id
+    # The stored count is normally an int already; other values go through int().
+    if type(session_count) is int:
+        count_int = session_count
+    else:
+        try:
+            count_int = int(session_count)
+        except (TypeError, ValueError):
+            count_int = 0
+    working.update(
+        {"session_count": count_int + 1, "last_session": completion_ts, "last_mission": mission_id}
+    )
 
-    project_context_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    replace_file_text(project_context_path, json.dumps(data, indent=2) + "\n")
 
 
 def _read_master_context(master_context_path: Path) -> dict[str, Any]:
     if not master_context_path.exists():
         raise FileNotFoundError(f"Master context file not found at {master_context_path}")
-    with master_context_path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+    return read_json_snapshot(master_context_path)
 
 
 def _format_check_in_summary(
@@ -318,6 +362,8 @@ class TriggerRegistry:
         self.agent = agent or _default_agent()
         self._handlers: dict[str, TriggerHandler] = {}
         self._trigger_meta: dict[str, dict[str, Any]] = {}
+        # Sorted (phrase, description, aliases) rows, rebuilt after a register call.
+        self._triggers_view: list[tuple[str, str | None, tuple[str, ...]]] | None = None
 
     def register(
         self,
@@ -330,37 +376,43 @@ class TriggerRegistry:
         base_norm = _normalize_phrase(phrase)
         meta = self._trigger_meta.setdefault(
             base_norm,
-            {"phrase": phrase, "description": description, "aliases": set()},
+            {"phrase": phrase, "description": description, "aliases": ()},
         )
         if description:
             meta["description"] = description
         self._handlers[base_norm] = handler
         if aliases:
-            alias_set: set[str] = meta.setdefault("aliases", set())
+            alias_set = set(meta["aliases"])
             for alias in aliases:
                 alias_norm = _normalize_phrase(alias)
                 self._handlers[alias_norm] = handler
                 alias_set.add(alias)
+            meta["aliases"] = tuple(sorted(alias_set))
+        self._triggers_view = None
 
     def handle(self, phrase: str, **kwargs: Any) -> TriggerResult:
-        normalized = _normalize_phrase(phrase)
-        handler = self._handlers.get(normalized)
+        # Registered keys hold single spaces only, so a phrase that matches after
+        # strip/lower normalizes to the same key; split/join runs only on a miss.
+        handler = self._handlers.get(phrase.strip().lower())
+        if handler is None:
+            handler = self._handlers.get(_normalize_phrase(phrase))
         if handler is None:
             raise KeyError(f"No trigger registered for phrase '{phrase}'.")
         return handler(self, phrase=phrase, **kwargs)
 
     def available_triggers(self) -> list[dict[str, Any]]:
-        results: list[dict[str, Any]] = []
-        for meta in self._trigger_meta.values():
-            aliases = sorted(meta.get("aliases", []))
-            results.append(
-                {
-                    "phrase": meta["phrase"],
-                    "description": meta.get("description"),
-                    "aliases": aliases,
-                }
+        view = self._triggers_view
+        if view is None:
+            view = sorted(
+                ((meta["phrase"], meta["description"], meta["aliases"]) for meta in self._trigger_meta.values()),
+                key=lambda row: row[0].lower(),
             )
-        return sorted(results, key=lambda item: item["phrase"].lower())
+            self._triggers_view = view
+        # Fresh dicts and lists each call, so callers may modify the result.
+        return [
+            {"phrase": phrase, "description": description, "aliases": list(aliases)}
+            for phrase, description, aliases in view
+        ]
 
     def recall_knowledge(self, query: str, *, limit: int = 5) -> List[RecallResult]:
         """Proxy helper that keeps recall paths aligned with the registry config."""
@@ -373,20 +425,19 @@ class TriggerRegistry:
 
         return list(kb_search(query, limit=limit, db_path=self.db_path))
 
-    def _select_active_mission(self) -> tuple[db_commands.Mission | None, bool]:
-        with db_commands.connect(self.db_path) as conn:
-            mission = db_commands.get_in_progress_mission(conn)
-            if mission:
-                return mission, False
-            mission = db_commands.get_current_mission(conn)
-            if mission:
-                db_commands.mark_in_progress(conn, mission_id=mission.id)
-                return db_commands.get_mission(conn, mission.id), True
-            mission = db_commands.get_next_queued_mission(conn)
-            if mission:
-                db_commands.mark_in_progress(conn, mission_id=mission.id)
-                return db_commands.get_mission(conn, mission.id), True
-            return None, False
+    def _select_active_mission(self, conn: sqlite3.Connection) -> tuple[db_commands.Mission | None, bool]:
+        mission = db_commands.get_in_progress_mission(conn)
+        if mission:
+            return mission, False
+        mission = db_commands.get_current_mission(conn)
+        if mission:
+            db_commands.mark_in_progress(conn, mission_id=mission.id)
+            return db_commands.get_mission(conn, mission.id), True
+        mission = db_commands.get_next_queued_mission(conn)
+        if mission:
+            db_commands.mark_in_progress(conn, mission_id=mission.id)
+            return db_commands.get_mission(conn, mission.id), True
+        return None, False
 
     def _run_current_mission(
         self,
@@ -394,19 +445,24 @@ class TriggerRegistry:
         phrase: str,
         executor: Callable[[MissionContext], MissionRunOutcome],
         start_summary: str | None = None,
+        sync_after_start: bool = False,
     ) -> TriggerResult:
-        mission, status_changed = self._select_active_mission()
-        if mission is None:
-            return TriggerResult(
-                trigger=phrase,
-                success=False,
-                message="No mission found with status In Progress, Current, or Queued.",
-            )
+        # Selection and the start log share one connection, and completion and the
+        # file syncs share another. The executor runs in between with none open, so
+        # it can write to the database; the sessions it queues are drained when the
+        # completion connection opens, before SESSIONS.jsonl is synced.
+        with db_commands.connect(self.db_path) as conn:
+            mission, status_changed = self._select_active_mission(conn)
+            if mission is None:
+                return TriggerResult(
+                    trigger=phrase,
+                    success=False,
+                    message="No mission found with status In Progress, Current, or Queued.",
+                )
 
-        start_ts: str | None = None
-        if status_changed:
-            start_ts = db_commands.utc_now_iso()
-            with db_commands.connect(self.db_path) as conn:
+            start_ts: str | None = None
+            if status_changed:
+                start_ts = db_commands.utc_now_iso()
                 db_commands.log_session(
                     conn,
                     action="start",
@@ -415,7 +471,10 @@ class TriggerRegistry:
                     summary=start_summary or f"Starting {mission.name}",
                     ts=start_ts,
                 )
-            _sync_backlog(self.db_path, self.backlog_path)
+                # The backlog is normally written once, after completion; executors that
+                # read it mid-run can ask for the In Progress state to be synced first.
+                if sync_after_start:
+                    _sync_backlog(conn, self.backlog_path)
 
         context = MissionContext(
             mission=mission,
@@ -426,7 +485,14 @@ class TriggerRegistry:
             master_context_path=self.master_context_path,
         )
 
-        outcome = executor(context)
+        try:
+            outcome = executor(context)
+        except Exception:
+            if status_changed and not sync_after_start:
+                # The run stops with the mission In Progress; keep the backlog in step.
+                with db_commands.connect(self.db_path) as conn:
+                    _sync_backlog(conn, self.backlog_path)
+            raise
         completion_ts = outcome.completed_at or db_commands.utc_now_iso()
 
         details = outcome.details.copy() if outcome.details else {}
@@ -434,7 +500,7 @@ class TriggerRegistry:
             details.setdefault("next_hint", outcome.next_hint)
         details_payload = json.dumps(details) if details else None
 
-        with db_commands.connect(self.db_path) as conn:
+        with db_commands.connect(self.db_path, drain_sessions=True) as conn:
             promoted = db_commands.complete_mission(
                 conn,
                 mission_id=mission.id,
@@ -450,9 +516,8 @@ class TriggerRegistry:
                 details=details_payload,
                 ts=completion_ts,
             )
-
-        _sync_backlog(self.db_path, self.backlog_path)
-        _sync_sessions(self.db_path, self.sessions_path)
+            _sync_backlog(conn, self.backlog_path)
+            _sync_sessions(conn, self.sessions_path)
         _update_project_context(self.project_context_path, mission_id=mission.id, completion_ts=completion_ts)
 
         payload: dict[str, Any] = {
@@ -474,8 +539,7 @@ class TriggerRegistry:
         project_context = {}
         master_context = {}
         try:
-            with self.project_context_path.open("r", encoding="utf-8") as handle:
-                project_context = json.load(handle)
+            project_context = read_json_snapshot(self.project_context_path)
         except FileNotFoundError:
             project_context = {}
         try: